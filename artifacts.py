@@ -0,0 +1,109 @@
+"""
+Tool outputs kept on disk until they are downloaded.
+
+Outputs are stored in a ``DiskCache``, so they expire with its ``max_age``
+and LRU size limit instead of piling up in server memory for the life of
+a session. Pages keep only an ``Artifact`` (a name, a path and a MIME
+type) and read the file when the user asks for it. Several artifacts can
+be bundled into one ZIP on demand; the archive is written to disk and
+stored in the cache like any other artifact.
+"""
+
+from __future__ import annotations
+
+import tempfile
+import uuid
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Iterable, Set, Union
+
+from disk_cache import DiskCache, make_key
+
+# Deflating these again only costs CPU.
+COMPRESSED_SUFFIXES = {
+    ".pdf", ".pptx", ".docx", ".xlsx", ".zip", ".gz", ".parquet", ".jpg", ".jpeg", ".png", ".webp",
+}
+ZIP_MIME = "application/zip"
+
+
+@dataclass(frozen=True)
+class Artifact:
+    name: str
+    path: Path
+    mime: str
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def read_bytes(self) -> bytes:
+        return self.path.read_bytes()
+
+
+def store_artifact(
+    cache: DiskCache,
+    source: Union[bytes, Path],
+    name: str,
+    mime: str,
+    move: bool = False,
+) -> Artifact:
+    """
+    Copy ``source`` (a buffer or a file) into the cache. With ``move`` the
+    source file is renamed into the cache entry instead, leaving the cache
+    as its only owner.
+    """
+    entry = cache.put(uuid.uuid4().hex, source, {"name": name, "mime": mime}, move=move)
+    return Artifact(name, entry.path, mime)
+
+
+def _unique_name(name: str, taken: Set[str]) -> str:
+    candidate, stem, suffix, n = name, Path(name).stem, Path(name).suffix, 1
+    while candidate in taken:
+        n += 1
+        candidate = f"{stem} ({n}){suffix}"
+    taken.add(candidate)
+    return candidate
+
+
+def write_zip_bundle(artifacts: Iterable[Artifact], fh: BinaryIO) -> int:
+    """
+    Write the artifacts that still exist into one ZIP. Each file is copied
+    in chunks, so only the archive being written grows. Returns the number
+    of files added.
+    """
+    taken: Set[str] = set()
+    added = 0
+    with zipfile.ZipFile(fh, "w") as zf:
+        for artifact in artifacts:
+            if not artifact.exists():
+                continue
+            compression = (
+                zipfile.ZIP_STORED
+                if Path(artifact.name).suffix.lower() in COMPRESSED_SUFFIXES
+                else zipfile.ZIP_DEFLATED
+            )
+            zf.write(artifact.path, _unique_name(artifact.name, taken), compress_type=compression)
+            added += 1
+    return added
+
+
+def store_bundle(cache: DiskCache, artifacts: Iterable[Artifact], name: str) -> Artifact:
+    """
+    Return a ZIP of ``artifacts`` kept in ``cache``, building it the first
+    time. The same artifacts under the same name reuse the stored archive.
+    """
+    artifacts = list(artifacts)
+    key = make_key("\n".join(str(artifact.path) for artifact in artifacts).encode("utf-8"), "bundle", name)
+    entry = cache.get(key)
+    if entry is not None:
+        return Artifact(name, entry.path, ZIP_MIME)
+
+    # Written next to the cache entries, outside the folders it scans.
+    with tempfile.NamedTemporaryFile(dir=cache.root, suffix=".zip", delete=False) as tmp:
+        tmp_path = Path(tmp.name)
+        write_zip_bundle(artifacts, tmp)
+    try:
+        entry = cache.put(key, tmp_path, {"name": name, "mime": ZIP_MIME}, move=True)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    return Artifact(name, entry.path, ZIP_MIME)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark the chapter image extractors on fixture pages.
+
+By default the trimmed chapter pages in ``tests/fixtures`` are used
+(``chapter-*.html``); ``--pages DIR`` reads every ``*.html`` file in DIR
+instead. ``--images`` generates synthetic WordPress-style pages of the
+given sizes: navigation, a long post body with eager and lazy-loaded
+``wp-image`` tags (placeholder ``src`` plus ``data-src``/``srcset``, with
+``<noscript>`` fallbacks), and a sidebar of unrelated images. All backends
+must return the same URLs. ``stream+stop`` is the stream backend stopping
+at the end of the post, as the downloader runs it.
+
+Usage:
+    python3 benchmarks/bench_image_extract.py [--repeat 20]
+    python3 benchmarks/bench_image_extract.py --pages saved_chapters/
+    python3 benchmarks/bench_image_extract.py --images 40 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from image_extract import CHAPTER_END_TAG, EXTRACTORS, STRAINER_PARSER, extract_stream  # noqa: E402
+
+FIXTURES = Path(__file__).resolve().parent.parent / "tests" / "fixtures"
+BASE_URL = "https://sakamotodays.org/comic/sakamoto-days-chapter-97/"
+PLACEHOLDER = "data:image/svg+xml,%3Csvg%20xmlns='http://www.w3.org/2000/svg'%3E%3C/svg%3E"
+
+
+def synthetic_page(n_images: int) -> str:
+    parts = [
+        "<!DOCTYPE html><html><head><title>Chapter</title>",
+        "<link rel='stylesheet' href='/style.css'>" * 20,
+        "<script>var config = {lazy: true};</script></head><body>",
+        "<nav>" + "<a href='/comic/'>Chapter</a> " * 150 + "</nav>",
+        "<article><div class='entry-content'>",
+    ]
+    for i in range(n_images):
+        src = f"https://cdn.example.com/wp-content/uploads/ch97/{i:03d}.jpg"
+        if i % 2:
+            parts.append(
+                f"<p><img class='aligncenter size-full wp-image-{1000 + i} lazyload' "
+                f"src=\"{PLACEHOLDER}\" data-src='{src}' "
+                f"data-srcset='{src} 1000w, {src[:-4]}-300x450.jpg 300w' "
+                f"width='1000' height='1500' alt='page {i}'>"
+                f"<noscript><img class='wp-image-{1000 + i}' src='{src}'></noscript></p>"
+            )
+        else:
+            parts.append(
+                f"<p><img loading='lazy' class='aligncenter size-full wp-image-{1000 + i}' "
+                f"src='{src}' width='1000' height='1500' alt='page {i}'></p>"
+            )
+        parts.append("<p>" + "Lorem ipsum dolor sit amet. " * 5 + "</p>")
+    parts.append("</div></article><aside>")
+    parts.extend(f"<img class='avatar' src='/avatars/{i}.png'>" for i in range(60))
+    parts.append("</aside><footer>" + "<a href='#'>link</a>" * 100 + "</footer></body></html>")
+    return "".join(parts)
+
+
+def load_pages(args: argparse.Namespace) -> List[Tuple[str, bytes]]:
+    if args.images:
+        return [(f"synthetic-{n}", synthetic_page(n).encode("utf-8")) for n in args.images]
+    if args.pages:
+        paths = Path(args.pages).glob("*.html")
+    else:
+        paths = FIXTURES.glob("chapter-*.html")
+    return [(path.name, path.read_bytes()) for path in sorted(paths)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", help="Directory of saved chapter pages (*.html).")
+    parser.add_argument("--images", type=int, nargs="+", help="Image counts of synthetic pages to use instead.")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    pages = load_pages(args)
+    if not pages:
+        sys.exit("No pages to benchmark.")
+    extractors = dict(EXTRACTORS)
+    extractors["stream+stop"] = lambda html, base_url: extract_stream(html, base_url, CHAPTER_END_TAG)
+
+    print(f"strainer backend parser: {STRAINER_PARSER}")
+    print(f"{'page':>16} {'KB':>7} {'images':>7}  " + "  ".join(f"{name:>11}" for name in extractors))
+
+    for label, html in pages:
+        results = {name: extract(html, BASE_URL) for name, extract in extractors.items()}
+        reference = results["soup"]
+        for name, urls in results.items():
+            if urls != reference:
+                sys.exit(f"{label}: {name} returned {len(urls)} URLs, soup returned {len(reference)}")
+
+        timings = []
+        for extract in extractors.values():
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                extract(html, BASE_URL)
+            timings.append((time.perf_counter() - started) / args.repeat * 1000)
+        print(
+            f"{label:>16} {len(html) / 1024:7.1f} {len(reference):7d}  "
+            + "  ".join(f"{ms:9.2f}ms" for ms in timings)
+        )
+
+
+if __name__ == "__main__":
+    main()
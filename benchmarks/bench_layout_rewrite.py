@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Benchmark the slide-layout rewrite on decks with hundreds of layouts.
+
+Synthetic Gamma-style decks are generated: every layout carries the
+watermark picture (linked to gamma.app, inside a group) next to ordinary
+placeholders, pictures with other links and Office extension namespaces.
+``--shapes`` sets how many placeholders each layout has, and ``--big``
+makes a few layouts much larger. A saved deck can be used instead with
+``--deck``.
+
+Each XML backend is compared with the reference: the recursive
+ElementTree walk and ``ET.tostring`` used before the backends existed.
+Every backend must produce byte-identical parts.
+
+Usage:
+    python3 benchmarks/bench_layout_rewrite.py [--layouts 100 400] [--shapes 40] [--repeat 3]
+    python3 benchmarks/bench_layout_rewrite.py --deck exports/deck.pptx
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import sys
+import time
+import zipfile
+from pathlib import Path
+from typing import Callable, Dict, List, Set, Tuple
+import xml.etree.ElementTree as ET
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import remove_gamma_logo as pptx_cleaner  # noqa: E402
+import xml_backend  # noqa: E402
+
+NS = pptx_cleaner.NS
+LAYOUT_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<p:sldLayout xmlns:a="{a}" xmlns:r="{r}" xmlns:p="{p}" '
+    'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006" '
+    'xmlns:p14="http://schemas.microsoft.com/office/powerpoint/2010/main" '
+    'mc:Ignorable="p14" preserve="1" userDrawn="1">'
+    '<p:cSld name="Layout {n}"><p:spTree><p:nvGrpSpPr><p:cNvPr id="1" name=""/><p:cNvGrpSpPr/><p:nvPr/>'
+    "</p:nvGrpSpPr><p:grpSpPr/>"
+)
+LAYOUT_FOOTER = (
+    '</p:spTree><p:extLst><p:ext uri="{{BB962C8B-B14F-4D97-AF65-F5344CB8AC3E}}">'
+    '<p14:creationId val="{n}"/></p:ext></p:extLst></p:cSld>'
+    "<p:clrMapOvr><a:masterClrMapping/></p:clrMapOvr></p:sldLayout>"
+)
+GAMMA_PICTURE = (
+    '<p:grpSp><p:nvGrpSpPr><p:cNvPr id="900" name="Group"/><p:cNvGrpSpPr/><p:nvPr/></p:nvGrpSpPr><p:grpSpPr/>'
+    '<p:pic><p:nvPicPr><p:cNvPr id="901" name="Made with Gamma"><a:hlinkClick r:id="rId2"/></p:cNvPr>'
+    '<p:cNvPicPr/><p:nvPr/></p:nvPicPr><p:blipFill><a:blip r:embed="rId3"/><a:stretch><a:fillRect/></a:stretch>'
+    "</p:blipFill><p:spPr/></p:pic></p:grpSp>"
+)
+LAYOUT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/slideMaster" '
+    'Target="../slideMasters/slideMaster1.xml"/>'
+    '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/hyperlink" '
+    'Target="https://gamma.app/?utm_source=made-with-gamma" TargetMode="External"/>'
+    '<Relationship Id="rId3" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/image" '
+    'Target="../media/image1.png"/>'
+    '<Relationship Id="rId4" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/hyperlink" '
+    'Target="https://example.com/" TargetMode="External"/>'
+    "</Relationships>"
+)
+
+
+def synthetic_layout(n: int, shapes: int) -> str:
+    parts = [LAYOUT_HEADER.format(n=n, **NS)]
+    for i in range(shapes):
+        parts.append(
+            f'<p:sp><p:nvSpPr><p:cNvPr id="{i + 2}" name="Placeholder {i}"/><p:cNvSpPr/>'
+            f'<p:nvPr><p:ph type="body" idx="{i}"/></p:nvPr></p:nvSpPr><p:spPr><a:xfrm>'
+            f'<a:off x="{i * 1000}" y="2000"/><a:ext cx="3000" cy="4000"/></a:xfrm>'
+            '<a:prstGeom prst="rect"><a:avLst/></a:prstGeom></p:spPr><p:txBody><a:bodyPr/><a:lstStyle/>'
+            f'<a:p><a:r><a:rPr lang="en-US" dirty="0"/><a:t>Text &lt;{i}&gt; &amp; more</a:t></a:r></a:p>'
+            "</p:txBody></p:sp>\n"
+        )
+        if i % 10 == 5:
+            parts.append(
+                f'<p:pic><p:nvPicPr><p:cNvPr id="{5000 + i}" name="Logo {i}"><a:hlinkClick r:id="rId4"/>'
+                '</p:cNvPr><p:cNvPicPr/><p:nvPr/></p:nvPicPr><p:blipFill><a:blip r:embed="rId3"/></p:blipFill>'
+                "<p:spPr/></p:pic>"
+            )
+    parts.append(GAMMA_PICTURE)
+    parts.append(LAYOUT_FOOTER.format(n=n))
+    return "".join(parts)
+
+
+def synthetic_deck(layouts: int, shapes: int, big: int, big_shapes: int) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zout:
+        zout.writestr("[Content_Types].xml", "<Types/>")
+        for n in range(1, layouts + 1):
+            count = big_shapes if n <= big else shapes
+            zout.writestr(f"ppt/slideLayouts/slideLayout{n}.xml", synthetic_layout(n, count))
+            zout.writestr(f"ppt/slideLayouts/_rels/slideLayout{n}.xml.rels", LAYOUT_RELS)
+    return buffer.getvalue()
+
+
+def reference_strip(layout_bytes: bytes, rel_bytes: bytes) -> Tuple[bytes, bytes]:
+    """The rewrite as it was before the XML backends: recursive walk plus ET.tostring."""
+    rel_tree = ET.fromstring(rel_bytes)
+    gamma_hlink_ids: Set[str] = set()
+    for rel in list(rel_tree):
+        if pptx_cleaner.is_gamma_hyperlink(rel):
+            gamma_hlink_ids.add(rel.get("Id"))
+            rel_tree.remove(rel)
+
+    layout_tree = ET.fromstring(layout_bytes)
+    embed_ids_to_remove: Set[str] = set()
+
+    def should_remove(pic) -> bool:
+        return any(
+            hlink.get(f"{{{NS['r']}}}id") in gamma_hlink_ids
+            for hlink in pic.findall(".//a:hlinkClick", NS)
+        )
+
+    def walk(parent):
+        for child in list(parent):
+            walk(child)
+        for child in list(parent):
+            if child.tag == pptx_cleaner.PIC_TAG and should_remove(child):
+                for blip in child.findall(".//a:blip", NS):
+                    rid = blip.get(f"{{{NS['r']}}}embed")
+                    if rid:
+                        embed_ids_to_remove.add(rid)
+                parent.remove(child)
+
+    walk(layout_tree)
+    for rel in list(rel_tree):
+        if rel.get("Id") in embed_ids_to_remove:
+            rel_tree.remove(rel)
+    return (
+        ET.tostring(layout_tree, encoding="utf-8", xml_declaration=True),
+        ET.tostring(rel_tree, encoding="utf-8", xml_declaration=True),
+    )
+
+
+Parts = List[Tuple[bytes, bytes]]
+
+
+def rewrite_reference(parts: Parts) -> List[bytes]:
+    outputs: List[bytes] = []
+    for layout_bytes, rel_bytes in parts:
+        outputs.extend(reference_strip(layout_bytes, rel_bytes))
+    return outputs
+
+
+def rewrite_with(backend: str) -> Callable[[Parts], List[bytes]]:
+    def rewrite(parts: Parts) -> List[bytes]:
+        saved, xml_backend.BACKEND = xml_backend.BACKEND, backend
+        try:
+            outputs: List[bytes] = []
+            for layout_bytes, rel_bytes in parts:
+                new_layout, new_rels, _ = pptx_cleaner.strip_gamma_from_layout(layout_bytes, rel_bytes)
+                outputs.extend((new_layout, new_rels))
+            return outputs
+        finally:
+            xml_backend.BACKEND = saved
+
+    return rewrite
+
+
+def layout_parts(deck: bytes) -> Parts:
+    """``(layout, rels)`` for every layout that links to gamma.app."""
+    with zipfile.ZipFile(io.BytesIO(deck)) as zin:
+        return [
+            (zin.read(layout_name), rel_bytes)
+            for layout_name, rel_bytes in pptx_cleaner.find_gamma_layouts(zin).items()
+        ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--layouts", type=int, nargs="+", default=[100, 400])
+    parser.add_argument("--shapes", type=int, default=40, help="Placeholders per layout.")
+    parser.add_argument("--big", type=int, default=2, help="Layouts made --big-shapes large.")
+    parser.add_argument("--big-shapes", type=int, default=4000)
+    parser.add_argument("--deck", help="Benchmark a saved .pptx instead.")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    backends: Dict[str, Callable[[Parts], List[bytes]]] = {"reference": rewrite_reference}
+    for name in xml_backend.FINDERS:
+        backends[name] = rewrite_with(name)
+
+    if args.deck:
+        decks = [(Path(args.deck).name, Path(args.deck).read_bytes())]
+    else:
+        decks = [
+            (f"{n} layouts", synthetic_deck(n, args.shapes, args.big, args.big_shapes))
+            for n in args.layouts
+        ]
+
+    print(f"{'deck':>12} {'XML MB':>7}  " + "  ".join(f"{name:>10}" for name in backends))
+    for label, deck in decks:
+        parts = layout_parts(deck)
+        reference = rewrite_reference(parts)
+        for name, rewrite in backends.items():
+            if rewrite(parts) != reference:
+                sys.exit(f"{label}: {name} output differs from the reference")
+
+        xml_bytes = sum(len(layout_bytes) for layout_bytes, _ in parts)
+        timings = []
+        for rewrite in backends.values():
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                rewrite(parts)
+            timings.append((time.perf_counter() - started) / args.repeat * 1000)
+        print(
+            f"{label:>12} {xml_bytes / (1024 * 1024):7.1f}  "
+            + "  ".join(f"{ms:8.1f}ms" for ms in timings)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Measure Streamlit cold-start import cost with ``python -X importtime``.
+
+Each measurement runs in a fresh interpreter that imports streamlit first,
+so only the app's own import cost is counted. Reported:
+
+    app        importing streamlit_app (paid on every cold start)
+    <module>   importing one tool module afterwards (paid the first time
+               that tool's page is opened)
+    eager      importing the app and every tool module up front, which is
+               what the app did before tools were loaded lazily
+
+Usage:
+    python3 benchmarks/bench_streamlit_import.py [--runs 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+TOOL_MODULES = (
+    "remove_gamma_logo",
+    "remove_gamma_logo_pdf",
+    "sanitize",
+    "export_iimjobs_applied",
+    "metadata_nuke",
+    "unlock_pdf",
+    "sakamoto_downloader",
+)
+
+
+def import_times(statements: List[str]) -> Dict[str, int]:
+    """Cumulative import time in microseconds per top-level module imported."""
+    code = "; ".join(["import sys", f"sys.path.insert(0, {str(ROOT)!r})", "import streamlit"] + statements)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=ROOT,
+    )
+    times: Dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nested imports are indented by two spaces per level.
+        if cumulative.strip().isdigit() and not name.startswith("  "):
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def median_ms(samples: List[int]) -> float:
+    return statistics.median(samples) / 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    app: List[int] = []
+    eager: List[int] = []
+    per_tool: Dict[str, List[int]] = {module: [] for module in TOOL_MODULES}
+
+    for _ in range(args.runs):
+        app.append(import_times(["import streamlit_app"]).get("streamlit_app", 0))
+
+        times = import_times(["import streamlit_app"] + [f"import {m}" for m in TOOL_MODULES])
+        eager.append(sum(times.get(name, 0) for name in ("streamlit_app",) + TOOL_MODULES))
+
+        for module in TOOL_MODULES:
+            times = import_times(["import streamlit_app", f"import {module}"])
+            per_tool[module].append(times.get(module, 0))
+
+    print(f"{'import':<40} {'median ms':>10}")
+    print(f"{'app (cold start)':<40} {median_ms(app):10.1f}")
+    for module, samples in per_tool.items():
+        print(f"{'  first open: ' + module:<40} {median_ms(samples):10.1f}")
+    print(f"{'eager (all tools)':<40} {median_ms(eager):10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark the content-stream scrubber on synthetic pages.
+
+Each page repeats a block of ordinary drawing operators plus a watermark
+draw wrapped in q/Q, so the number of operators and the number of matches
+grow together. Per-operator time should stay flat as the page grows.
+
+Usage:
+    python3 benchmarks/bench_strip_draw_commands.py [--sizes 100000 200000 400000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pypdf import PdfWriter  # noqa: E402
+from pypdf.generic import DecodedStreamObject, NameObject  # noqa: E402
+
+from remove_gamma_logo_pdf import filter_draw_operations, strip_draw_commands  # noqa: E402
+
+WATERMARK = "/Im0"
+BLOCK = (
+    b"q 1 0 0 1 10 10 cm BT /F1 12 Tf (text) Tj ET Q\n"
+    b"0 0 1 rg 0 0 5 5 re f\n"
+    b"q 575 0 0 137 20 20 cm /Im0 Do Q\n"
+)
+OPS_PER_BLOCK = 17
+WATERMARK_OPS_PER_BLOCK = 4
+
+
+def synthetic_ops(n_ops: int) -> list:
+    block = [
+        ([], b"q"),
+        ([1, 0, 0, 1, 10, 10], b"cm"),
+        ([], b"BT"),
+        (["/F1", 12], b"Tf"),
+        (["text"], b"Tj"),
+        ([], b"ET"),
+        ([], b"Q"),
+        ([0, 0, 1], b"rg"),
+        ([0, 0, 5, 5], b"re"),
+        ([], b"f"),
+        ([], b"q"),
+        ([575, 0, 0, 137, 20, 20], b"cm"),
+        ([WATERMARK], b"Do"),
+        ([], b"Q"),
+        ([], b"q"),
+        (["/Other"], b"Do"),
+        ([], b"Q"),
+    ]
+    return block * (n_ops // OPS_PER_BLOCK)
+
+
+def synthetic_page(n_ops: int):
+    writer = PdfWriter()
+    page = writer.add_blank_page(612, 792)
+    stream = DecodedStreamObject()
+    stream.set_data(BLOCK * (n_ops // OPS_PER_BLOCK))
+    page[NameObject("/Contents")] = writer._add_object(stream)
+    return writer, page
+
+
+def bench_filter(n_ops: int) -> float:
+    ops = synthetic_ops(n_ops)
+    started = time.perf_counter()
+    kept, removed = filter_draw_operations(ops, {WATERMARK})
+    elapsed = time.perf_counter() - started
+    assert removed == len(ops) // OPS_PER_BLOCK
+    assert len(kept) == len(ops) - removed * WATERMARK_OPS_PER_BLOCK
+    return elapsed
+
+
+def bench_page(n_ops: int) -> float:
+    writer, page = synthetic_page(n_ops)
+    started = time.perf_counter()
+    removed = strip_draw_commands(page, writer, {WATERMARK: None})
+    elapsed = time.perf_counter() - started
+    assert removed == n_ops // OPS_PER_BLOCK
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        type=int,
+        default=[100_000, 200_000, 400_000, 800_000],
+        help="Operator counts per synthetic page.",
+    )
+    args = parser.parse_args()
+
+    print(f"{'operators':>10} {'filter s':>10} {'ns/op':>8} {'page s':>10} {'ns/op':>8}")
+    for n_ops in args.sizes:
+        filter_s = bench_filter(n_ops)
+        page_s = bench_page(n_ops)
+        print(
+            f"{n_ops:>10} {filter_s:>10.3f} {filter_s / n_ops * 1e9:>8.0f} "
+            f"{page_s:>10.3f} {page_s / n_ops * 1e9:>8.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""
+A small pool of warm headless browsers shared by concurrent exports.
+
+Starting Chrome costs seconds and a few hundred MB, so exporters lease a
+browser from ``BrowserPool`` instead of launching their own. At most
+``max_size`` browsers exist at once; further callers wait for one to be
+returned. Each browser runs in its own throwaway profile directory and is
+wiped (cookies, cache, extra windows, and the storage of the ``origins``
+the pool was given) when it is handed back, so one lease never sees
+another's login. Browsers idle for longer than
+``idle_timeout`` are shut down, down to ``min_idle`` warm instances.
+
+Usage:
+    pool = BrowserPool(
+        lambda profile: build_driver(user_data_dir=profile),
+        max_size=2,
+        origins=["https://example.com"],
+    )
+    with pool.lease() as driver:
+        driver.get("https://example.com")
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_SIZE = 2
+DEFAULT_IDLE_TIMEOUT = 5 * 60
+# Browsers are restarted after this many leases to shed leaked memory.
+DEFAULT_MAX_USES = 50
+REAPER_INTERVAL = 30
+
+DriverFactory = Callable[[str], Any]
+
+
+class PoolClosedError(RuntimeError):
+    """Raised when leasing from a pool that has been shut down."""
+
+
+@dataclass
+class PooledBrowser:
+    driver: Any
+    profile_dir: str
+    uses: int = 0
+    idle_since: float = field(default_factory=time.monotonic)
+
+
+def reset_browser(driver: Any, origins: Iterable[str] = ()) -> None:
+    """
+    Drop everything a lease may have left behind in the browser. Cookies and
+    the cache are cleared for every site; local storage, IndexedDB and the
+    like only for ``origins``, as Chrome clears those one origin at a time.
+    """
+    handles = driver.window_handles
+    for handle in handles[1:]:
+        driver.switch_to.window(handle)
+        driver.close()
+    driver.switch_to.window(handles[0])
+    driver.get("about:blank")
+    if not hasattr(driver, "execute_cdp_cmd"):
+        # WebDriver alone can only clear the current site's cookies.
+        raise RuntimeError("Only Chromium-based browsers can be wiped for reuse.")
+    driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+    driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+    for origin in origins:
+        driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+
+
+class BrowserPool:
+    def __init__(
+        self,
+        factory: DriverFactory,
+        max_size: int = DEFAULT_MAX_SIZE,
+        min_idle: int = 0,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        max_uses: int = DEFAULT_MAX_USES,
+        origins: Iterable[str] = (),
+    ) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.factory = factory
+        self.max_size = max_size
+        self.min_idle = min(min_idle, max_size)
+        self.idle_timeout = idle_timeout
+        self.max_uses = max_uses
+        self.origins = tuple(origins)
+        self._idle: List[PooledBrowser] = []
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._reaper: Optional[threading.Thread] = None
+        # Separate from _cond so the reaper never swallows a release notification.
+        self._stopped = threading.Event()
+        atexit.register(self.close)
+
+    def _start_browser(self) -> PooledBrowser:
+        profile_dir = tempfile.mkdtemp(prefix="gammaverse-browser-")
+        try:
+            return PooledBrowser(self.factory(profile_dir), profile_dir)
+        except Exception:
+            shutil.rmtree(profile_dir, ignore_errors=True)
+            raise
+
+    @staticmethod
+    def _stop_browser(browser: PooledBrowser) -> None:
+        try:
+            browser.driver.quit()
+        except Exception:
+            logger.debug("Browser did not quit cleanly", exc_info=True)
+        shutil.rmtree(browser.profile_dir, ignore_errors=True)
+
+    @staticmethod
+    def _is_alive(browser: PooledBrowser) -> bool:
+        try:
+            browser.driver.window_handles
+        except Exception:
+            return False
+        return True
+
+    def _ensure_reaper(self) -> None:
+        if self._reaper is None and self.idle_timeout:
+            self._reaper = threading.Thread(
+                target=self._reap_forever, name="browser-pool-reaper", daemon=True
+            )
+            self._reaper.start()
+
+    def warm_up(self) -> None:
+        """Start browsers in the background until ``min_idle`` are waiting."""
+
+        def fill() -> None:
+            while True:
+                with self._cond:
+                    if self._closed or len(self._idle) >= self.min_idle or self._size >= self.max_size:
+                        return
+                    self._size += 1
+                try:
+                    browser = self._start_browser()
+                except Exception:
+                    logger.warning("Could not warm up a browser", exc_info=True)
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    return
+                self._put_idle(browser)
+
+        threading.Thread(target=fill, name="browser-pool-warmup", daemon=True).start()
+
+    def _put_idle(self, browser: PooledBrowser) -> None:
+        with self._cond:
+            if self._closed:
+                self._size -= 1
+                stop = True
+            else:
+                browser.idle_since = time.monotonic()
+                self._idle.append(browser)
+                stop = False
+            self._cond.notify()
+        if stop:
+            self._stop_browser(browser)
+
+    def acquire(self, timeout: Optional[float] = None) -> PooledBrowser:
+        """Take a warm browser, start a new one, or wait for one to be released."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            browser = None
+            with self._cond:
+                self._ensure_reaper()
+                while True:
+                    if self._closed:
+                        raise PoolClosedError("The browser pool has been closed.")
+                    if self._idle:
+                        # Most recently used first, so extra browsers go idle and get reaped.
+                        browser = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        break
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError("No browser became available in time.")
+                    self._cond.wait(remaining)
+
+            if browser is None:
+                break
+            if self._is_alive(browser):
+                return browser
+            # Crashed while idle; free its slot and try again.
+            self._discard(browser)
+
+        try:
+            return self._start_browser()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+    def release(self, browser: PooledBrowser, broken: bool = False) -> None:
+        """Return a leased browser, wiped clean, or retire it if that fails."""
+        browser.uses += 1
+        if not broken and browser.uses < self.max_uses:
+            try:
+                reset_browser(browser.driver, self.origins)
+            except Exception:
+                logger.info("Retiring a browser that could not be reset", exc_info=True)
+                broken = True
+        else:
+            broken = True
+
+        if broken:
+            self._discard(browser)
+        else:
+            self._put_idle(browser)
+
+    def _discard(self, browser: PooledBrowser) -> None:
+        self._stop_browser(browser)
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None) -> Iterator[Any]:
+        browser = self.acquire(timeout)
+        broken = False
+        try:
+            yield browser.driver
+        except BaseException:
+            # The page may be in any state after a failure; start fresh next time.
+            broken = True
+            raise
+        finally:
+            self.release(browser, broken=broken)
+
+    def evict_idle(self) -> int:
+        """Shut down browsers idle for longer than ``idle_timeout``."""
+        now = time.monotonic()
+        with self._cond:
+            keep = len(self._idle) - self.min_idle
+            expired = []
+            # _idle is ordered oldest release first.
+            for browser in list(self._idle):
+                if keep <= 0:
+                    break
+                if now - browser.idle_since >= self.idle_timeout:
+                    self._idle.remove(browser)
+                    expired.append(browser)
+                    keep -= 1
+            self._size -= len(expired)
+            if expired:
+                self._cond.notify_all()
+        for browser in expired:
+            self._stop_browser(browser)
+        return len(expired)
+
+    def _reap_forever(self) -> None:
+        interval = min(REAPER_INTERVAL, self.idle_timeout)
+        while not self._stopped.wait(interval):
+            self.evict_idle()
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "max_size": self.max_size,
+            }
+
+    def close(self) -> None:
+        """Quit idle browsers now; leased ones quit when they are released."""
+        with self._cond:
+            self._closed = True
+            self._stopped.set()
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for browser in idle:
+            self._stop_browser(browser)
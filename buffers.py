@@ -0,0 +1,26 @@
+"""
+Helpers for the in-memory (bytes / BytesIO / memoryview) cleaner APIs.
+"""
+
+from __future__ import annotations
+
+import io
+from typing import BinaryIO, Union
+
+Buffer = Union[bytes, bytearray, memoryview, BinaryIO]
+
+
+def as_stream(data: Buffer) -> BinaryIO:
+    """Wrap raw bytes in a BytesIO; rewind and return file objects as-is."""
+    if hasattr(data, "read"):
+        if data.seekable():
+            data.seek(0)
+        return data
+    return io.BytesIO(data)
+
+
+def as_bytes(data: Buffer) -> bytes:
+    """Materialize a buffer, e.g. to send it to a worker process."""
+    if hasattr(data, "read"):
+        return as_stream(data).read()
+    return bytes(data)
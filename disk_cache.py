@@ -0,0 +1,237 @@
+"""
+Small on-disk blob cache with size- and age-based LRU eviction.
+
+Each entry is a blob plus a JSON metadata sidecar, stored under a
+hex key. Reading an entry refreshes its access time; when the cache grows
+past ``max_bytes`` the least recently used entries are removed first, and
+entries older than ``max_age`` seconds are dropped regardless of size.
+
+The directory is scanned once, when the cache is opened. After that the
+cache keeps its own index of entry sizes and times, so ``put`` and
+``stats`` do not touch the rest of the directory. Entries written by
+another process are only noticed when they are read or the cache is
+reopened.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import shutil
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_MAX_AGE = 24 * 60 * 60
+# Expired entries are swept at most this often unless the size limit forces it.
+SWEEP_INTERVAL = 60
+BLOB_SUFFIX = ".bin"
+META_SUFFIX = ".json"
+# Keys derived from secrets use this, so they cannot be matched across restarts
+# or brute-forced from the file names.
+_PROCESS_SECRET = secrets.token_bytes(32)
+
+
+def make_key(data: Union[bytes, bytearray, memoryview], *parts: Any) -> str:
+    """Hash a content buffer together with the tool name and options."""
+    digest = hashlib.sha256(data).hexdigest()
+    extra = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(f"{digest}:{extra}".encode("utf-8")).hexdigest()
+
+
+def secret_token(secret: str) -> str:
+    """
+    Stand-in for a secret such as a password in ``make_key`` options.
+
+    An HMAC under a random per-process key: equal secrets still share cache
+    entries while the process runs, but the token reveals nothing about the
+    secret and is worthless once the process exits.
+    """
+    return hmac.new(_PROCESS_SECRET, secret.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+@dataclass
+class _Stored:
+    accessed: float
+    size: int
+    created: float
+
+
+@dataclass
+class CacheEntry:
+    path: Path
+    metadata: Dict[str, Any]
+
+    def read_bytes(self) -> bytes:
+        return self.path.read_bytes()
+
+
+class DiskCache:
+    def __init__(
+        self,
+        root: Path,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_age: float = DEFAULT_MAX_AGE,
+    ) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._index: Dict[str, _Stored] = {}
+        self._bytes = 0
+        self._next_sweep = 0.0
+        self._scan()
+
+    def _paths(self, key: str) -> Tuple[Path, Path]:
+        folder = self.root / key[:2]
+        return folder / f"{key}{BLOB_SUFFIX}", folder / f"{key}{META_SUFFIX}"
+
+    def _expired(self, created: float, now: float) -> bool:
+        return bool(self.max_age) and now - created > self.max_age
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        blob_path, meta_path = self._paths(key)
+        with self._lock:
+            now = time.time()
+            try:
+                stored = self._index.get(key) or self._stat(key)
+                if self._expired(stored.created, now):
+                    self._remove(key)
+                    self.misses += 1
+                    return None
+                metadata = json.loads(meta_path.read_text(encoding="utf-8"))
+                os.utime(blob_path)
+            except (OSError, ValueError):
+                self.misses += 1
+                return None
+            stored.accessed = now
+            self._track(key, stored)
+            self.hits += 1
+            return CacheEntry(blob_path, metadata)
+
+    def put(
+        self,
+        key: str,
+        data: Union[bytes, bytearray, memoryview, Path],
+        metadata: Optional[Dict[str, Any]] = None,
+        move: bool = False,
+    ) -> CacheEntry:
+        """
+        Store ``data`` (a buffer or a file to copy) under ``key``. With
+        ``move`` a file is renamed into the cache rather than copied; it is
+        copied and then deleted only if it lives on another file system.
+        """
+        blob_path, meta_path = self._paths(key)
+        blob_path.parent.mkdir(parents=True, exist_ok=True)
+        metadata = dict(metadata or {})
+
+        with self._lock:
+            if move and isinstance(data, Path):
+                self._move_into(blob_path, data)
+            else:
+                self._write_atomic(blob_path, data)
+            self._write_atomic(meta_path, json.dumps(metadata).encode("utf-8"))
+            now = time.time()
+            self._track(key, _Stored(now, blob_path.stat().st_size, now))
+            self._evict(now)
+        return CacheEntry(blob_path, metadata)
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def evict(self) -> int:
+        with self._lock:
+            return self._evict(time.time(), force_sweep=True)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._index),
+                "bytes": self._bytes,
+            }
+
+    def _write_atomic(
+        self, path: Path, data: Union[bytes, bytearray, memoryview, Path]
+    ) -> None:
+        with tempfile.NamedTemporaryFile(delete=False, dir=path.parent) as tmp:
+            tmp_path = Path(tmp.name)
+        try:
+            with open(tmp_path, "wb") as fh:
+                if isinstance(data, Path):
+                    with open(data, "rb") as src:
+                        shutil.copyfileobj(src, fh)
+                else:
+                    fh.write(data)
+            os.replace(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    def _move_into(self, path: Path, source: Path) -> None:
+        try:
+            os.replace(source, path)
+            # The blob's mtime is its access time once the cache is reopened.
+            os.utime(path)
+        except OSError:
+            # Most likely a different file system; rename can't cross it.
+            self._write_atomic(path, source)
+            source.unlink(missing_ok=True)
+
+    def _remove(self, key: str) -> None:
+        for path in self._paths(key):
+            path.unlink(missing_ok=True)
+        stored = self._index.pop(key, None)
+        if stored is not None:
+            self._bytes -= stored.size
+
+    def _track(self, key: str, stored: _Stored) -> None:
+        previous = self._index.get(key)
+        if previous is not None:
+            self._bytes -= previous.size
+        self._index[key] = stored
+        self._bytes += stored.size
+
+    def _stat(self, key: str) -> _Stored:
+        """Read an entry's size and times from disk."""
+        blob_path, meta_path = self._paths(key)
+        blob = blob_path.stat()
+        # The sidecar is written once per put, so its mtime is the entry's age.
+        return _Stored(blob.st_mtime, blob.st_size, meta_path.stat().st_mtime)
+
+    def _scan(self) -> None:
+        for blob_path in self.root.glob(f"*/*{BLOB_SUFFIX}"):
+            key = blob_path.stem
+            try:
+                self._track(key, self._stat(key))
+            except OSError:
+                self._remove(key)
+        self._evict(time.time(), force_sweep=True)
+
+    def _evict(self, now: float, force_sweep: bool = False) -> int:
+        removed = 0
+        if self.max_age and (force_sweep or now >= self._next_sweep):
+            self._next_sweep = now + min(self.max_age, SWEEP_INTERVAL)
+            expired = [key for key, stored in self._index.items() if self._expired(stored.created, now)]
+            for key in expired:
+                self._remove(key)
+            removed += len(expired)
+
+        if self._bytes > self.max_bytes:
+            for key, _ in sorted(self._index.items(), key=lambda item: item[1].accessed):
+                if self._bytes <= self.max_bytes:
+                    break
+                self._remove(key)
+                removed += 1
+        return removed
@@ -5,37 +5,78 @@ Utility to export iimjobs.com applied jobs into a CSV file.
 Requirements:
     - Selenium (with ChromeDriver available on PATH)
     - requests
+    - pyarrow (optional, for Parquet output)
 
 Environment variables:
     IIMJOBS_EMAIL      -> user login email (required)
     IIMJOBS_PASSWORD   -> user password (required)
     IIMJOBS_HEADLESS   -> optional ("0" to disable headless Chrome, defaults to headless)
     IIMJOBS_CSV_PATH   -> optional output path; defaults to ./iimjobs_applied_jobs.csv
+                          (.parquet needs pyarrow; .ndjson.gz writes gzipped JSON lines)
+    IIMJOBS_SESSION_DIR -> optional directory for cached login sessions
+    IIMJOBS_NO_SESSION_CACHE -> optional ("1" to always log in with Chrome)
+    IIMJOBS_INCREMENTAL -> optional ("1" to fetch only new/changed applications and merge
+                           them into the existing CSV)
+    IIMJOBS_SETTLED_PAGES -> optional; incremental runs stop after this many pages in a
+                             row with nothing new or changed (default 1, "0" checks
+                             the whole history for status changes)
 """
 
 from __future__ import annotations
 
 import csv
+import gzip
+import hashlib
+import json
 import os
 import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
+from browser_pool import BrowserPool
+
 APPLIED_JOBS_URL = "https://www.iimjobs.com/applied-jobs"
 APPLIED_JOBS_API = (
     "https://gladiator.iimjobs.com/job/applied-jobs?"
     "page={page}&status=&ref=menu&referenceText=menu&refPool=%7B%22ref%22:%22menu%22%7D"
 )
+# Sites whose storage pooled browsers wipe between logins.
+SITE_ORIGINS = ("https://www.iimjobs.com", "https://gladiator.iimjobs.com")
 DEFAULT_OUTPUT = "iimjobs_applied_jobs.csv"
+# The API serves 50 jobs per page; a shorter page is the last one.
+PAGE_SIZE = 50
+# Pages requested at once. Pages past the end come back empty, so probing
+# ahead costs at most this many wasted requests.
+MAX_PAGE_WORKERS = 4
+RATE_LIMIT_RETRIES = 5
+RATE_LIMIT_BACKOFF = 1.0
+REQUEST_TIMEOUT = 30
+# Logged-in sessions are cached here and reused until they expire or the
+# API stops accepting them.
+SESSION_CACHE_DIR = os.getenv(
+    "IIMJOBS_SESSION_DIR", os.path.join(tempfile.gettempdir(), "gammaverse-iimjobs-sessions")
+)
+SESSION_TTL = 12 * 60 * 60
+# Unchanged pages in a row after which an incremental export stops paging.
+DEFAULT_SETTLED_PAGES = 1
+PARQUET_ROW_GROUP = 10_000
+BROWSER_POOL_SIZE = int(os.getenv("IIMJOBS_BROWSER_POOL_SIZE", "2"))
+BROWSER_IDLE_TIMEOUT = float(os.getenv("IIMJOBS_BROWSER_IDLE_SECONDS", "300"))
 
 # Load environment variables from .env file if present
 
@@ -51,7 +92,7 @@ STATUS_LABELS = {
 }
 
 
-@dataclass
+@dataclass(slots=True)
 class AppliedJob:
     application_id: int
     application_date: Optional[str]
@@ -80,11 +121,13 @@ def require_env(name: str) -> str:
     return value
 
 
-def build_driver(headless: bool = True) -> webdriver.Chrome:
+def build_driver(headless: bool = True, user_data_dir: Optional[str] = None) -> webdriver.Chrome:
     """Create a Chrome WebDriver instance."""
     options = Options()
     if headless:
         options.add_argument("--headless=new")
+    if user_data_dir:
+        options.add_argument(f"--user-data-dir={user_data_dir}")
     options.add_argument("--disable-gpu")
     options.add_argument("--no-sandbox")
     options.add_argument("--disable-dev-shm-usage")
@@ -115,10 +158,12 @@ def login(driver: webdriver.Chrome, email: str, password: str) -> None:
     wait.until(EC.url_contains("applied-jobs"))
 
 
-def build_session(driver: webdriver.Chrome) -> requests.Session:
-    """Transfer cookies from Selenium to a requests session."""
+def new_session(user_agent: str) -> requests.Session:
+    """A pooled requests session with the headers the applied-jobs API expects."""
     session = requests.Session()
-    user_agent = driver.execute_script("return navigator.userAgent;")
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=MAX_PAGE_WORKERS)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
     session.headers.update(
         {
             "User-Agent": user_agent,
@@ -126,38 +171,255 @@ def build_session(driver: webdriver.Chrome) -> requests.Session:
             "Referer": APPLIED_JOBS_URL,
         }
     )
+    return session
+
 
-    for cookie in driver.get_cookies():
+def set_session_cookies(session: requests.Session, cookies: Iterable[Dict[str, Any]]) -> None:
+    """
+    Copy Selenium-style cookie dicts into ``session``. The login happens on
+    www.iimjobs.com but the API lives on gladiator.iimjobs.com, so cookies
+    are set without their domain and path, and are sent to both hosts.
+    """
+    for cookie in cookies:
         session.cookies.set(cookie["name"], cookie["value"])
 
+
+def build_session(driver: webdriver.Chrome) -> requests.Session:
+    """Transfer cookies from Selenium to a requests session."""
+    session = new_session(driver.execute_script("return navigator.userAgent;"))
+    set_session_cookies(session, driver.get_cookies())
     return session
 
 
-def fetch_applied_jobs(session: requests.Session) -> List[Dict[str, Any]]:
-    """Iterate over all paginated applied job API responses."""
-    jobs: List[Dict[str, Any]] = []
-    page = 0
+class RateLimiter:
+    """Pause every worker until the server's Retry-After window has passed."""
+
+    def __init__(self) -> None:
+        self._resume_at = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            delay = self._resume_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self._resume_at = max(self._resume_at, time.monotonic() + seconds)
 
+
+def retry_after_seconds(response: requests.Response) -> Optional[float]:
+    """Parse a Retry-After header given either in seconds or as an HTTP date."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def fetch_applied_jobs_page(
+    session: requests.Session,
+    page: int,
+    limiter: Optional[RateLimiter] = None,
+) -> List[Dict[str, Any]]:
+    """Fetch one page of applied jobs, backing off when rate limited."""
+    limiter = limiter or RateLimiter()
+    url = APPLIED_JOBS_API.format(page=page)
+    attempt = 0
     while True:
-        url = APPLIED_JOBS_API.format(page=page)
-        response = session.get(url, timeout=30)
+        limiter.wait()
+        response = session.get(url, timeout=REQUEST_TIMEOUT)
+        if response.status_code == 429 and attempt < RATE_LIMIT_RETRIES:
+            delay = retry_after_seconds(response)
+            limiter.pause(delay if delay is not None else RATE_LIMIT_BACKOFF * 2 ** attempt)
+            attempt += 1
+            continue
         response.raise_for_status()
-        payload = response.json()
+        data = response.json().get("data") or {}
+        return data.get("jobs") or []
+
+
+def iter_applied_job_pages(
+    session: requests.Session,
+    workers: int = MAX_PAGE_WORKERS,
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yield pages of raw applied jobs in page order.
+
+    The total is not known up front, so up to ``workers`` pages are kept in
+    flight ahead of the one being consumed. Paging stops at the first empty
+    or short page and any requests already sent past it are discarded.
+    """
+    limiter = RateLimiter()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        in_flight = {}
+        next_page = 0
+
+        def submit() -> None:
+            nonlocal next_page
+            in_flight[next_page] = pool.submit(fetch_applied_jobs_page, session, next_page, limiter)
+            next_page += 1
+
+        for _ in range(max(1, workers)):
+            submit()
+
+        page = 0
+        try:
+            while True:
+                batch = in_flight.pop(page).result()
+                if not batch:
+                    break
+                yield batch
+                if len(batch) < PAGE_SIZE:
+                    break
+                page += 1
+                submit()
+        finally:
+            for future in in_flight.values():
+                future.cancel()
+
+
+def fetch_applied_jobs(
+    session: requests.Session,
+    workers: int = MAX_PAGE_WORKERS,
+) -> List[Dict[str, Any]]:
+    """Fetch all paginated applied job API responses."""
+    jobs: List[Dict[str, Any]] = []
+    for batch in iter_applied_job_pages(session, workers):
+        jobs.extend(batch)
+    return jobs
 
-        data = payload.get("data") or {}
-        batch = data.get("jobs") or []
 
-        if not batch:
-            break
+def session_cache_path(email: str, password: str) -> Path:
+    """
+    Cached sessions are filed under a slow hash of the credentials, so only
+    someone who knows the password can pick up a saved login.
+    """
+    digest = hashlib.pbkdf2_hmac(
+        "sha256", password.encode("utf-8"), email.strip().lower().encode("utf-8"), 100_000
+    )
+    return Path(SESSION_CACHE_DIR) / f"{digest.hex()}.json"
+
+
+def session_state(session: requests.Session, cookies: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Describe a logged-in session: cookies, user agent and when it expires."""
+    expires_at = time.time() + SESSION_TTL
+    for cookie in cookies:
+        if cookie.get("expiry"):
+            expires_at = min(expires_at, float(cookie["expiry"]))
+    return {
+        "user_agent": session.headers.get("User-Agent", ""),
+        "cookies": [
+            {key: cookie[key] for key in ("name", "value", "domain", "path") if cookie.get(key)}
+            for cookie in cookies
+        ],
+        "expires_at": expires_at,
+    }
+
+
+def save_session(path: Path, state: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".part")
+    # Session cookies are as good as a password; keep them private.
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as fh:
+        json.dump(state, fh)
+    os.replace(tmp_path, path)
+
+
+def session_from_state(state: Dict[str, Any]) -> requests.Session:
+    session = new_session(state["user_agent"])
+    set_session_cookies(session, state["cookies"])
+    return session
 
-        jobs.extend(batch)
 
-        if len(batch) < 50:
-            break
+def is_session_valid(session: requests.Session) -> bool:
+    """One request for the first page tells whether the API still accepts the cookies."""
+    try:
+        response = session.get(
+            APPLIED_JOBS_API.format(page=0), timeout=REQUEST_TIMEOUT, allow_redirects=False
+        )
+        return response.status_code == 200 and isinstance(response.json().get("data"), dict)
+    except (requests.RequestException, ValueError, AttributeError):
+        return False
 
-        page += 1
 
-    return jobs
+def load_cached_session(path: Path) -> Optional[requests.Session]:
+    """Return the saved session at ``path`` if it has not expired and still works."""
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            state = json.load(fh)
+        if state["expires_at"] > time.time():
+            session = session_from_state(state)
+            if is_session_valid(session):
+                return session
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    path.unlink(missing_ok=True)
+    return None
+
+
+def make_browser_pool(
+    headless: bool = True,
+    max_size: int = BROWSER_POOL_SIZE,
+    idle_timeout: float = BROWSER_IDLE_TIMEOUT,
+) -> BrowserPool:
+    """A pool of Chrome instances for servers running many exports at once."""
+    return BrowserPool(
+        lambda profile_dir: build_driver(headless=headless, user_data_dir=profile_dir),
+        max_size=max_size,
+        idle_timeout=idle_timeout,
+        origins=SITE_ORIGINS,
+    )
+
+
+def _login_session(
+    driver: webdriver.Chrome, email: str, password: str, cache_path: Optional[Path]
+) -> requests.Session:
+    login(driver, email, password)
+    session = build_session(driver)
+    if cache_path is not None:
+        save_session(cache_path, session_state(session, driver.get_cookies()))
+    return session
+
+
+def open_session(
+    email: str,
+    password: str,
+    headless: bool = True,
+    use_cache: bool = True,
+    browser_pool: Optional[BrowserPool] = None,
+) -> requests.Session:
+    """
+    Return a logged-in API session, starting Chrome only when there is no
+    cached session for these credentials or the API rejects it. With a
+    ``browser_pool``, the login borrows one of its browsers instead.
+    """
+    cache_path = session_cache_path(email, password) if use_cache else None
+    if cache_path is not None:
+        session = load_cached_session(cache_path)
+        if session is not None:
+            return session
+
+    if browser_pool is not None:
+        with browser_pool.lease() as driver:
+            return _login_session(driver, email, password, cache_path)
+
+    driver: Optional[webdriver.Chrome] = None
+    try:
+        driver = build_driver(headless=headless)
+        return _login_session(driver, email, password, cache_path)
+    finally:
+        if driver:
+            driver.quit()
 
 
 def to_iso_date(timestamp_ms: Optional[int]) -> Optional[str]:
@@ -210,33 +472,249 @@ def serialize_job(raw_job: Dict[str, Any]) -> AppliedJob:
     )
 
 
-def write_jobs_to_csv(jobs: Iterable[AppliedJob], output_path: Path) -> None:
-    fieldnames = [
+CSV_FIELDS = [
+    "application_id",
+    "application_date",
+    "title",
+    "company",
+    "locations",
+    "job_url",
+    "app_status_code",
+    "app_status_label",
+    "recruiter_name",
+    "recruiter_email",
+    "recruiter_org",
+    "recruiter_last_login",
+    "recruiter_last_active",
+    "views",
+    "app_count",
+    "recruiter_actions",
+    "invite_status",
+]
+
+
+def job_row(job: AppliedJob) -> Dict[str, Any]:
+    return {name: getattr(job, name) for name in CSV_FIELDS}
+
+
+def iter_jobs(
+    session: requests.Session,
+    workers: int = MAX_PAGE_WORKERS,
+    progress: Optional[Callable[[int], None]] = None,
+) -> Iterator[AppliedJob]:
+    """
+    Serialize applied jobs page by page as the API returns them, calling
+    ``progress`` with the running total after each page.
+    """
+    total = 0
+    for batch in iter_applied_job_pages(session, workers):
+        for raw_job in batch:
+            yield serialize_job(raw_job)
+        total += len(batch)
+        if progress is not None:
+            progress(total)
+
+
+def _write_csv(jobs: Iterable[AppliedJob], path: Path) -> int:
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(CSV_FIELDS)
+        for job in jobs:
+            writer.writerow([getattr(job, name) for name in CSV_FIELDS])
+            count += 1
+    return count
+
+
+def _write_ndjson_gz(jobs: Iterable[AppliedJob], path: Path) -> int:
+    count = 0
+    with gzip.open(path, "wt", encoding="utf-8") as fh:
+        for job in jobs:
+            fh.write(json.dumps(job_row(job)) + "\n")
+            count += 1
+    return count
+
+
+def _write_parquet(jobs: Iterable[AppliedJob], path: Path) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet output needs pyarrow (pip install pyarrow).") from None
+
+    integer_fields = {
         "application_id",
-        "application_date",
-        "title",
-        "company",
-        "locations",
-        "job_url",
         "app_status_code",
-        "app_status_label",
-        "recruiter_name",
-        "recruiter_email",
-        "recruiter_org",
-        "recruiter_last_login",
-        "recruiter_last_active",
         "views",
         "app_count",
         "recruiter_actions",
         "invite_status",
-    ]
+    }
+    schema = pa.schema(
+        [(name, pa.int64() if name in integer_fields else pa.string()) for name in CSV_FIELDS]
+    )
+
+    count = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        columns: Dict[str, List[Any]] = {name: [] for name in CSV_FIELDS}
+        for job in jobs:
+            for name in CSV_FIELDS:
+                columns[name].append(getattr(job, name))
+            count += 1
+            if len(columns["application_id"]) >= PARQUET_ROW_GROUP:
+                writer.write_table(pa.table(columns, schema=schema))
+                columns = {name: [] for name in CSV_FIELDS}
+        if columns["application_id"] or not count:
+            writer.write_table(pa.table(columns, schema=schema))
+    return count
+
+
+OUTPUT_FORMATS = {
+    "csv": _write_csv,
+    "ndjson.gz": _write_ndjson_gz,
+    "parquet": _write_parquet,
+}
+
+
+def output_format(output_path: Path) -> str:
+    """Pick the format from the file name; anything unrecognised is CSV."""
+    name = Path(output_path).name.lower()
+    if name.endswith((".ndjson.gz", ".jsonl.gz")):
+        return "ndjson.gz"
+    if name.endswith(".parquet"):
+        return "parquet"
+    return "csv"
+
+
+def write_jobs(
+    jobs: Iterable[AppliedJob],
+    output_path: Path,
+    fmt: Optional[str] = None,
+) -> int:
+    """
+    Stream ``jobs`` into ``output_path`` and return how many were written.
+    The file only appears under its final name once it is complete.
+    """
+    output_path = Path(output_path)
+    writer = OUTPUT_FORMATS[fmt or output_format(output_path)]
+    tmp_path = output_path.with_name(output_path.name + ".part")
+    try:
+        count = writer(jobs, tmp_path)
+        os.replace(tmp_path, output_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    return count
+
+
+def write_jobs_to_csv(jobs: Iterable[AppliedJob], output_path: Path) -> None:
+    write_jobs(jobs, output_path, "csv")
+
+
+def state_path_for(output_path: Path) -> Path:
+    """Incremental exports remember what they have seen next to the CSV."""
+    output_path = Path(output_path)
+    return output_path.with_name(output_path.name + ".state.json")
+
+
+def _status_code(value: Any) -> Optional[int]:
+    if value in (None, ""):
+        return None
+    return int(value)
+
 
+def load_known_statuses(output_path: Path) -> Dict[int, Optional[int]]:
+    """
+    Map every exported applicationId to the app_status it was exported with.
+    Falls back to the CSV itself when the state file is missing; an export
+    with no CSV starts from scratch.
+    """
     output_path = Path(output_path)
-    with open(output_path, "w", newline="", encoding="utf-8") as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+    if not output_path.exists():
+        return {}
+    try:
+        with open(state_path_for(output_path), "r", encoding="utf-8") as fh:
+            return {int(key): value for key, value in json.load(fh).items()}
+    except (OSError, ValueError):
+        pass
+    with open(output_path, "r", newline="", encoding="utf-8") as csvfile:
+        return {
+            int(row["application_id"]): _status_code(row["app_status_code"])
+            for row in csv.DictReader(csvfile)
+            if row.get("application_id")
+        }
+
+
+def save_known_statuses(output_path: Path, statuses: Dict[int, Optional[int]]) -> None:
+    state_path = state_path_for(output_path)
+    tmp_path = state_path.with_name(state_path.name + ".part")
+    with open(tmp_path, "w", encoding="utf-8") as fh:
+        json.dump({str(key): value for key, value in statuses.items()}, fh)
+    os.replace(tmp_path, state_path)
+
+
+def fetch_changed_jobs(
+    session: requests.Session,
+    known: Dict[int, Optional[int]],
+    workers: int = MAX_PAGE_WORKERS,
+    settled_pages: int = DEFAULT_SETTLED_PAGES,
+) -> List[Dict[str, Any]]:
+    """
+    Fetch applications that are new or whose status changed since ``known``.
+
+    The API lists the newest applications first, so paging stops after
+    ``settled_pages`` pages in a row on which every application is already
+    known and unchanged. A status change on an application older than that
+    is missed until a run reaches its page; ``settled_pages=0`` reads the
+    whole history (still merging only the rows that changed).
+    """
+    changed: List[Dict[str, Any]] = []
+    unchanged_run = 0
+    for batch in iter_applied_job_pages(session, workers):
+        fresh = [
+            job
+            for job in batch
+            if job.get("applicationId") not in known
+            or known[job.get("applicationId")] != job.get("app_status")
+        ]
+        changed.extend(fresh)
+        unchanged_run = 0 if fresh else unchanged_run + 1
+        if known and settled_pages and unchanged_run >= settled_pages:
+            break
+    return changed
+
+
+def merge_jobs_into_csv(jobs: List[AppliedJob], output_path: Path) -> Dict[int, Optional[int]]:
+    """
+    Merge new and updated rows into an existing export and return the status
+    of every application in it. Updated rows keep their position; new ones
+    go on top, where a full export would put them.
+    """
+    output_path = Path(output_path)
+    updates = {job.application_id: job_row(job) for job in jobs}
+
+    rows: List[Dict[str, Any]] = []
+    if output_path.exists():
+        with open(output_path, "r", newline="", encoding="utf-8") as csvfile:
+            rows = list(csv.DictReader(csvfile))
+    existing_ids = {int(row["application_id"]) for row in rows if row.get("application_id")}
+
+    merged = [updates[job.application_id] for job in jobs if job.application_id not in existing_ids]
+    for row in rows:
+        application_id = int(row["application_id"]) if row.get("application_id") else None
+        merged.append(updates.get(application_id, row))
+
+    tmp_path = output_path.with_name(output_path.name + ".part")
+    with open(tmp_path, "w", newline="", encoding="utf-8") as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=CSV_FIELDS)
         writer.writeheader()
-        for job in jobs:
-            writer.writerow(job.__dict__)
+        writer.writerows(merged)
+    os.replace(tmp_path, output_path)
+
+    return {
+        int(row["application_id"]): _status_code(row["app_status_code"])
+        for row in merged
+        if row.get("application_id") not in (None, "")
+    }
 
 
 def export_applied_jobs(
@@ -244,25 +722,57 @@ def export_applied_jobs(
     password: str,
     output_path: Optional[Path] = None,
     headless: bool = True,
+    incremental: bool = False,
+    use_session_cache: bool = True,
+    browser_pool: Optional[BrowserPool] = None,
+    progress: Optional[Callable[[int], None]] = None,
+    settled_pages: int = DEFAULT_SETTLED_PAGES,
 ) -> Tuple[Path, int]:
+    """
+    Export applied jobs to ``output_path`` and return it with the number of
+    rows written. With ``incremental``, only new and changed applications
+    are fetched and merged into an existing export, and the count covers
+    just those rows (see ``fetch_changed_jobs`` for ``settled_pages``).
+    Every export records the status of each application it wrote, so the
+    next incremental run compares against it. With ``use_session_cache``,
+    a saved login is reused when the API still accepts it. ``browser_pool``
+    (see ``make_browser_pool``) lets concurrent exports share warm
+    browsers. ``progress`` is called with the number of applications
+    fetched so far.
+    """
     if not email or not password:
         raise ValueError("Email and password are required.")
     output_path = Path(output_path or DEFAULT_OUTPUT)
-    driver: Optional[webdriver.Chrome] = None
-    try:
-        driver = build_driver(headless=headless)
-        login(driver, email, password)
-
-        session = build_session(driver)
-        raw_jobs = fetch_applied_jobs(session)
+    if incremental and output_format(output_path) != "csv":
+        raise ValueError("Incremental exports can only be merged into a CSV file.")
+    session = open_session(
+        email,
+        password,
+        headless=headless,
+        use_cache=use_session_cache,
+        browser_pool=browser_pool,
+    )
 
+    if incremental:
+        raw_jobs = fetch_changed_jobs(
+            session, load_known_statuses(output_path), settled_pages=settled_pages
+        )
+        if progress is not None:
+            progress(len(raw_jobs))
         serialized_jobs = [serialize_job(job) for job in raw_jobs]
-        write_jobs_to_csv(serialized_jobs, output_path)
-
+        save_known_statuses(output_path, merge_jobs_into_csv(serialized_jobs, output_path))
         return output_path, len(serialized_jobs)
-    finally:
-        if driver:
-            driver.quit()
+
+    statuses: Dict[int, Optional[int]] = {}
+
+    def remember(jobs: Iterable[AppliedJob]) -> Iterator[AppliedJob]:
+        for job in jobs:
+            statuses[job.application_id] = job.app_status_code
+            yield job
+
+    count = write_jobs(remember(iter_jobs(session, progress=progress)), output_path)
+    save_known_statuses(output_path, statuses)
+    return output_path, count
 
 
 def main() -> None:
@@ -271,14 +781,23 @@ def main() -> None:
     output_path = os.getenv("IIMJOBS_CSV_PATH", DEFAULT_OUTPUT)
 
     headless = os.getenv("IIMJOBS_HEADLESS", "1") != "0"
+    incremental = os.getenv("IIMJOBS_INCREMENTAL", "0") == "1"
+    settled_pages = int(os.getenv("IIMJOBS_SETTLED_PAGES", str(DEFAULT_SETTLED_PAGES)))
+    use_session_cache = os.getenv("IIMJOBS_NO_SESSION_CACHE", "0") != "1"
 
     path, count = export_applied_jobs(
         email=email,
         password=password,
         output_path=Path(output_path),
         headless=headless,
+        incremental=incremental,
+        use_session_cache=use_session_cache,
+        settled_pages=settled_pages,
     )
-    print(f"Exported {count} jobs to {path}")
+    if incremental:
+        print(f"Merged {count} new or updated jobs into {path}")
+    else:
+        print(f"Exported {count} jobs to {path}")
 
 if __name__ == "__main__":
     try:
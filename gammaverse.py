@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Batch command line for the GammaVerse cleaners.
+
+Cleans every Gamma PPTX and PDF found in the given directories, globs or
+manifest files in one interpreter, fanning the files out over a process
+pool. One NDJSON record is written per file with its outcome and timing.
+``clean_buffer`` and ``nuke_buffer`` are the in-memory equivalents used
+for batches of uploads. ``detect`` only reports which files carry the
+watermark, reading as little of each file as it can.
+
+Usage:
+    python3 gammaverse.py clean exports/ "archive/**/*.pdf" --workers 8
+    python3 gammaverse.py clean --manifest files.txt --output-dir clean/ --results results.ndjson
+    python3 gammaverse.py detect exports/
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import metadata_nuke
+import remove_gamma_logo as pptx_cleaner
+import remove_gamma_logo_pdf as pdf_cleaner
+
+SUPPORTED_SUFFIXES = (".pptx", ".pdf")
+
+
+def read_manifest(path: Path) -> List[str]:
+    """Read one input per line, ignoring blank lines and ``#`` comments."""
+    entries = []
+    with open(path, "r", encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                entries.append(line)
+    return entries
+
+
+def discover_inputs(patterns: Iterable[str]) -> List[Tuple[Path, Path]]:
+    """
+    Expand directories and globs into ``(source, relative output path)`` pairs.
+
+    Directories are searched recursively and keep their layout under the
+    output directory, as do glob matches below the pattern's first wildcard;
+    both skip files that are not PPTX or PDF. Files named outright keep
+    only their name.
+    """
+    found: List[Tuple[Path, Path]] = []
+    seen = set()
+
+    def add(path: Path, relative: Path) -> None:
+        key = path.resolve()
+        if key not in seen:
+            seen.add(key)
+            found.append((path, relative))
+
+    for pattern in patterns:
+        path = Path(pattern).expanduser()
+        if path.is_dir():
+            for child in sorted(path.rglob("*")):
+                if is_supported(child):
+                    add(child, child.relative_to(path))
+        elif path.exists():
+            add(path, Path(path.name))
+        else:
+            root = glob_root(path)
+            for match in sorted(glob.glob(str(path), recursive=True)):
+                match_path = Path(match)
+                if is_supported(match_path):
+                    add(match_path, match_path.relative_to(root))
+    return found
+
+
+def is_supported(path: Path) -> bool:
+    return path.is_file() and path.suffix.lower() in SUPPORTED_SUFFIXES
+
+
+def glob_root(pattern: Path) -> Path:
+    """The leading part of ``pattern`` that contains no wildcards."""
+    parts = []
+    for part in pattern.parts:
+        if glob.has_magic(part):
+            break
+        parts.append(part)
+    return Path(*parts) if parts else Path()
+
+
+def find_output_clashes(jobs: List[Tuple[Path, Path]]) -> Dict[Path, List[Path]]:
+    """Relative output paths claimed by more than one source."""
+    claimed: Dict[Path, List[Path]] = {}
+    for src, relative in jobs:
+        claimed.setdefault(relative, []).append(src)
+    return {relative: sources for relative, sources in claimed.items() if len(sources) > 1}
+
+
+def clean_file(src: str, dest: Optional[str]) -> Dict[str, Any]:
+    """Clean a single file and describe the outcome as a JSON-ready dict."""
+    src_path = Path(src)
+    dest_path = Path(dest) if dest else src_path
+    kind = src_path.suffix.lower().lstrip(".")
+    record: Dict[str, Any] = {"path": src, "output": str(dest_path), "kind": kind}
+
+    started = time.perf_counter()
+    try:
+        if kind == "pptx":
+            dest_path.parent.mkdir(parents=True, exist_ok=True)
+            removed = pptx_cleaner.process_pptx(src_path, dest_path)
+        elif kind == "pdf":
+            dest_path.parent.mkdir(parents=True, exist_ok=True)
+            removed = pdf_cleaner.process_pdf(src_path, output_path=dest_path)
+        else:
+            raise ValueError(f"Unsupported file type: {src_path.suffix or src}")
+        record["status"] = "cleaned" if removed else "unchanged"
+        record["removed"] = removed
+        if not removed:
+            record["output"] = None
+    except Exception as exc:
+        record["status"] = "error"
+        record["removed"] = 0
+        record["output"] = None
+        record["error"] = str(exc)
+    record["seconds"] = round(time.perf_counter() - started, 4)
+    return record
+
+
+def detect_file(src: str) -> Dict[str, Any]:
+    """Check a single file for the watermark without rewriting it."""
+    src_path = Path(src)
+    kind = src_path.suffix.lower().lstrip(".")
+    record: Dict[str, Any] = {"path": src, "kind": kind}
+
+    started = time.perf_counter()
+    try:
+        if kind == "pptx":
+            record["watermarked"] = pptx_cleaner.detect_pptx(src_path)
+        elif kind == "pdf":
+            record["watermarked"] = pdf_cleaner.detect_pdf(src_path)
+        else:
+            raise ValueError(f"Unsupported file type: {src_path.suffix or src}")
+    except Exception as exc:
+        record["watermarked"] = None
+        record["error"] = str(exc)
+    record["seconds"] = round(time.perf_counter() - started, 4)
+    return record
+
+
+def clean_buffer(data: bytes, ext: str) -> Tuple[Optional[bytes], Dict[str, Any]]:
+    """
+    Remove the watermark from one uploaded file. Returns the cleaned bytes
+    (None when nothing matched) and ``{"removed": count}``.
+    """
+    if ext == ".pptx":
+        output, removed = pptx_cleaner.process_pptx_buffer(data)
+    elif ext == ".pdf":
+        output, removed = pdf_cleaner.process_pdf_buffer(data)
+    else:
+        raise ValueError(f"Unsupported file type: {ext}")
+    return output, {"removed": removed}
+
+
+def nuke_buffer(data: bytes, ext: str) -> Tuple[Optional[bytes], Dict[str, Any]]:
+    """
+    Strip the metadata from one uploaded file. Returns the scrubbed bytes
+    (None on failure) and ``{"success": bool}``.
+    """
+    if ext == ".pptx":
+        output = metadata_nuke.nuke_pptx_metadata_buffer(data)
+    elif ext == ".pdf":
+        output = metadata_nuke.nuke_pdf_metadata_buffer(data)
+    else:
+        raise ValueError(f"Unsupported file type: {ext}")
+    return output, {"success": output is not None}
+
+
+def run_clean(
+    jobs: List[Tuple[Path, Path]],
+    output_dir: Optional[Path],
+    workers: int,
+    results,
+) -> int:
+    """Clean ``jobs`` on a process pool, writing one NDJSON line per file."""
+    failures = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(
+                clean_file,
+                str(src),
+                str(output_dir / relative) if output_dir else None,
+            )
+            for src, relative in jobs
+        ]
+        for future in as_completed(futures):
+            record = future.result()
+            if record["status"] == "error":
+                failures += 1
+            results.write(json.dumps(record) + "\n")
+            results.flush()
+    return failures
+
+
+def resolve_inputs(args: argparse.Namespace) -> Optional[List[Tuple[Path, Path]]]:
+    """Expand the command's inputs and manifest, reporting on stderr if none match."""
+    patterns = list(args.inputs)
+    if args.manifest:
+        patterns.extend(read_manifest(Path(args.manifest)))
+    if not patterns:
+        print("Error: no inputs given.", file=sys.stderr)
+        return None
+
+    jobs = discover_inputs(patterns)
+    if not jobs:
+        print("Error: no matching .pptx or .pdf files found.", file=sys.stderr)
+        return None
+    return jobs
+
+
+def cmd_clean(args: argparse.Namespace) -> int:
+    jobs = resolve_inputs(args)
+    if jobs is None:
+        return 2
+
+    output_dir = Path(args.output_dir).expanduser() if args.output_dir else None
+    if output_dir:
+        clashes = find_output_clashes(jobs)
+        if clashes:
+            for relative, sources in clashes.items():
+                names = ", ".join(str(src) for src in sources)
+                print(f"Error: {names} map to the same output {output_dir / relative}", file=sys.stderr)
+            return 2
+    workers = pdf_cleaner.resolve_workers(args.workers)
+
+    started = time.perf_counter()
+    if args.results:
+        with open(args.results, "w", encoding="utf-8") as results:
+            failures = run_clean(jobs, output_dir, workers, results)
+    else:
+        failures = run_clean(jobs, output_dir, workers, sys.stdout)
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"Processed {len(jobs)} file(s) in {elapsed:.1f}s with {workers} worker(s); "
+        f"{failures} failed.",
+        file=sys.stderr,
+    )
+    return 1 if failures else 0
+
+
+def cmd_detect(args: argparse.Namespace) -> int:
+    jobs = resolve_inputs(args)
+    if jobs is None:
+        return 2
+
+    started = time.perf_counter()
+    watermarked = failures = 0
+    for src, _ in jobs:
+        record = detect_file(str(src))
+        if record["watermarked"]:
+            watermarked += 1
+        elif record["watermarked"] is None:
+            failures += 1
+        print(json.dumps(record), flush=True)
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"Checked {len(jobs)} file(s) in {elapsed:.2f}s: {watermarked} watermarked; "
+        f"{failures} failed.",
+        file=sys.stderr,
+    )
+    return 1 if failures else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="gammaverse", description=__doc__.splitlines()[1])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    clean = subparsers.add_parser("clean", help="Remove Gamma watermarks in bulk.")
+    clean.add_argument(
+        "inputs",
+        nargs="*",
+        help="Files, directories (searched recursively) or glob patterns.",
+    )
+    clean.add_argument("--manifest", help="Text file listing one input per line.")
+    clean.add_argument(
+        "--output-dir",
+        help="Write cleaned copies here instead of modifying files in place.",
+    )
+    clean.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Worker processes (default: one per CPU).",
+    )
+    clean.add_argument(
+        "--results",
+        help="Write NDJSON results to this file instead of stdout.",
+    )
+    clean.set_defaults(func=cmd_clean)
+
+    detect = subparsers.add_parser(
+        "detect", help="List which files carry the Gamma watermark without changing them."
+    )
+    detect.add_argument(
+        "inputs",
+        nargs="*",
+        help="Files, directories (searched recursively) or glob patterns.",
+    )
+    detect.add_argument("--manifest", help="Text file listing one input per line.")
+    detect.set_defaults(func=cmd_detect)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
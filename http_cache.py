@@ -0,0 +1,101 @@
+"""
+Persistent HTTP cache with conditional revalidation.
+
+Responses that carry an ``ETag`` or ``Last-Modified`` validator are stored
+in a ``DiskCache`` keyed by URL. Later requests for the same URL send
+``If-None-Match`` / ``If-Modified-Since`` and a ``304 Not Modified`` answer
+is served from disk, so unchanged pages and images cost a round trip but
+no transfer. Size-capped LRU eviction comes from ``DiskCache``.
+"""
+
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Callable, Dict
+
+import requests
+
+from disk_cache import DEFAULT_MAX_BYTES, DiskCache, make_key
+
+# Entries are revalidated on every use, so age only limits how long unused
+# responses linger on disk.
+DEFAULT_MAX_AGE = 30 * 24 * 60 * 60
+
+SendFn = Callable[[Dict[str, str]], requests.Response]
+
+
+def url_key(url: str) -> str:
+    return make_key(url.encode("utf-8"), "http")
+
+
+def is_storable(response: requests.Response) -> bool:
+    if "no-store" in response.headers.get("Cache-Control", "").lower():
+        return False
+    return bool(response.headers.get("ETag") or response.headers.get("Last-Modified"))
+
+
+class HttpCache:
+    def __init__(
+        self,
+        root: Path,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_age: float = DEFAULT_MAX_AGE,
+    ) -> None:
+        self.store = DiskCache(root, max_bytes=max_bytes, max_age=max_age)
+        self.downloaded = 0
+        self.revalidated = 0
+        self._lock = threading.Lock()
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def fetch(self, url: str, send: SendFn) -> bytes:
+        """
+        Return the body of ``url``. ``send(headers)`` performs the actual
+        GET with the given extra headers and returns the response.
+        """
+        key = url_key(url)
+        entry = self.store.get(key)
+        headers: Dict[str, str] = {}
+        if entry is not None:
+            if entry.metadata.get("etag"):
+                headers["If-None-Match"] = entry.metadata["etag"]
+            if entry.metadata.get("last_modified"):
+                headers["If-Modified-Since"] = entry.metadata["last_modified"]
+
+        response = send(headers)
+        if response.status_code == 304 and entry is not None:
+            try:
+                body = entry.read_bytes()
+            except OSError:
+                # Evicted between the lookup and the read; fetch it in full.
+                self.store.discard(key)
+                response = send({})
+            else:
+                self._count("revalidated")
+                return body
+
+        response.raise_for_status()
+        self._count("downloaded")
+        if is_storable(response):
+            self.store.put(
+                key,
+                response.content,
+                {
+                    "url": url,
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                    "content_type": response.headers.get("Content-Type"),
+                },
+            )
+        else:
+            self.store.discard(key)
+        return response.content
+
+    def stats(self) -> Dict[str, int]:
+        stats = self.store.stats()
+        stats["downloaded"] = self.downloaded
+        stats["revalidated"] = self.revalidated
+        return stats
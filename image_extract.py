@@ -0,0 +1,202 @@
+"""
+Find the page images on a chapter page.
+
+Chapter images are ``<img>`` tags whose class contains ``wp-image``. Lazy
+loading plugins move the real address into ``data-src`` / ``data-lazy-src``
+(or a ``srcset`` variant) and leave a placeholder in ``src``, so every
+backend resolves the source the same way through ``image_source``, makes
+it absolute against the page URL and drops repeats (``<noscript>``
+fallbacks repeat every image).
+
+Pages given as bytes are decoded the way BeautifulSoup would: a byte
+order mark or ``<meta>`` charset wins, then UTF-8, then Windows-1252.
+With ``stop_tag`` the stream backend stops parsing at the first closing
+``stop_tag`` after a chapter image (the end of the post), skipping the
+comments and sidebar, unless the image class still appears in the rest of
+the page; then it carries on to the next one. Either way it returns what a
+full read would. The BeautifulSoup backends always read the whole page.
+
+Backends:
+    stream    html.parser.HTMLParser subclass; no tree is built (default)
+    strainer  BeautifulSoup parsing only ``<img>`` tags, with lxml if installed
+    soup      full BeautifulSoup tree with html.parser, as the scraper used to
+"""
+
+from __future__ import annotations
+
+from html.parser import HTMLParser
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Union
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.dammit import EncodingDetector
+
+try:
+    import lxml  # noqa: F401
+
+    STRAINER_PARSER = "lxml"
+except ImportError:
+    STRAINER_PARSER = "html.parser"
+
+IMAGE_CLASS = "wp-image"
+# Checked in order; the first one holding a real URL wins.
+LAZY_SOURCE_ATTRS = ("data-src", "data-lazy-src", "data-orig-file")
+SRCSET_ATTRS = ("data-srcset", "data-lazy-srcset", "srcset")
+FEED_CHUNK = 64 * 1024
+# WordPress wraps each post, and so each chapter's images, in <article>.
+CHAPTER_END_TAG = "article"
+
+Html = Union[str, bytes]
+Extractor = Callable[..., List[str]]
+
+
+def _is_real_url(value: Optional[str]) -> bool:
+    return bool(value) and not value.strip().startswith("data:")
+
+
+def largest_srcset_candidate(srcset: str) -> Optional[str]:
+    """Pick the widest (or densest) candidate from a ``srcset`` value."""
+    best_url, best_size = None, -1.0
+    for candidate in srcset.split(","):
+        parts = candidate.split()
+        if not parts:
+            continue
+        size = 0.0
+        if len(parts) > 1 and parts[1][-1:] in ("w", "x"):
+            try:
+                size = float(parts[1][:-1])
+            except ValueError:
+                pass
+        if size > best_size:
+            best_url, best_size = parts[0], size
+    return best_url
+
+
+def image_source(attrs: Mapping[str, Optional[str]]) -> Optional[str]:
+    """Return the real image address of one ``<img>``'s attributes."""
+    for name in LAZY_SOURCE_ATTRS:
+        if _is_real_url(attrs.get(name)):
+            return attrs[name].strip()
+    if _is_real_url(attrs.get("src")):
+        return attrs["src"].strip()
+    for name in SRCSET_ATTRS:
+        if attrs.get(name):
+            candidate = largest_srcset_candidate(attrs[name])
+            if _is_real_url(candidate):
+                return candidate
+    return None
+
+
+def has_image_class(class_value: Union[str, Iterable[str], None]) -> bool:
+    if not class_value:
+        return False
+    classes = class_value.split() if isinstance(class_value, str) else class_value
+    return any(IMAGE_CLASS in c for c in classes)
+
+
+def _finish(sources: Iterable[Optional[str]], base_url: str) -> List[str]:
+    urls: List[str] = []
+    seen = set()
+    for source in sources:
+        if not source:
+            continue
+        url = urljoin(base_url, source)
+        if url not in seen:
+            seen.add(url)
+            urls.append(url)
+    return urls
+
+
+def _as_text(html: Html) -> str:
+    if isinstance(html, str):
+        return html
+    data, encoding = EncodingDetector.strip_byte_order_mark(html)
+    encoding = encoding or EncodingDetector.find_declared_encoding(data, is_html=True)
+    for candidate in (encoding, "utf-8"):
+        if candidate:
+            try:
+                return data.decode(candidate)
+            except (LookupError, UnicodeDecodeError):
+                pass
+    return data.decode("windows-1252", errors="replace")
+
+
+class ImageTagParser(HTMLParser):
+    """
+    Collect chapter image sources while the page is fed in. ``done`` is set
+    once ``stop_tag`` closes after at least one image was found; the caller
+    decides whether to feed the rest.
+    """
+
+    def __init__(self, stop_tag: Optional[str] = None) -> None:
+        super().__init__(convert_charrefs=True)
+        self.stop_tag = stop_tag
+        self.sources: List[Optional[str]] = []
+        self.done = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "img":
+            attr_map = dict(attrs)
+            if has_image_class(attr_map.get("class")):
+                self.sources.append(image_source(attr_map))
+
+    handle_startendtag = handle_starttag
+
+    def handle_endtag(self, tag):
+        if tag == self.stop_tag and self.sources:
+            self.done = True
+
+
+def extract_stream(html: Html, base_url: str = "", stop_tag: Optional[str] = None) -> List[str]:
+    parser = ImageTagParser(stop_tag)
+    text = _as_text(html)
+    for start in range(0, len(text), FEED_CHUNK):
+        end = min(start + FEED_CHUNK, len(text))
+        parser.feed(text[start:end])
+        if parser.done:
+            # ``rawdata`` is the tail the parser has not consumed yet. A
+            # chapter image past this point would carry the class name.
+            if text.find(IMAGE_CLASS, end - len(parser.rawdata)) < 0:
+                break
+            parser.done = False
+    else:
+        parser.close()
+    return _finish(parser.sources, base_url)
+
+
+def extract_strainer(html: Html, base_url: str = "", stop_tag: Optional[str] = None) -> List[str]:
+    soup = BeautifulSoup(html, STRAINER_PARSER, parse_only=SoupStrainer("img"))
+    return _finish(
+        (image_source(img.attrs) for img in soup.find_all("img") if has_image_class(img.get("class"))),
+        base_url,
+    )
+
+
+def extract_soup(html: Html, base_url: str = "", stop_tag: Optional[str] = None) -> List[str]:
+    soup = BeautifulSoup(html, "html.parser")
+    return _finish(
+        (image_source(img.attrs) for img in soup.find_all("img") if has_image_class(img.get("class"))),
+        base_url,
+    )
+
+
+EXTRACTORS: Dict[str, Extractor] = {
+    "stream": extract_stream,
+    "strainer": extract_strainer,
+    "soup": extract_soup,
+}
+DEFAULT_EXTRACTOR = "stream"
+
+
+def extract_image_urls(
+    html: Html,
+    base_url: str = "",
+    backend: str = DEFAULT_EXTRACTOR,
+    stop_tag: Optional[str] = None,
+) -> List[str]:
+    """Absolute, de-duplicated chapter image URLs in page order."""
+    try:
+        extractor = EXTRACTORS[backend]
+    except KeyError:
+        raise ValueError(f"Unknown extractor: {backend}") from None
+    return extractor(html, base_url, stop_tag)
@@ -0,0 +1,184 @@
+"""
+In-process background jobs for long-running tools.
+
+Streamlit reruns the whole script on every widget interaction, so work
+done inline is thrown away (and blocks the session) until it finishes.
+``JobManager`` runs such work on a thread pool instead. Callers keep only
+the job ID, which survives reruns, and poll ``get`` for a snapshot of the
+job's status, progress, the partial results emitted so far and the final
+result. Finished jobs are forgotten after ``ttl`` seconds.
+
+Job functions receive a ``JobContext`` as their first argument:
+
+    def work(ctx, urls):
+        for i, url in enumerate(urls, 1):
+            if ctx.cancelled:
+                return None
+            ctx.emit(download(url))
+            ctx.progress(i / len(urls), f"Finished {url}")
+        return "done"
+
+    job_id = manager.submit("download", work, urls)
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_TTL = 60 * 60
+
+
+@dataclass
+class Job:
+    id: str
+    name: str
+    status: str = QUEUED
+    progress: float = 0.0
+    message: str = ""
+    items: List[Any] = field(default_factory=list)
+    result: Any = None
+    error: Optional[str] = None
+    cancel_requested: bool = False
+    created: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in FINISHED
+
+
+class JobContext:
+    """Handed to a running job so it can report back to its manager."""
+
+    def __init__(self, manager: "JobManager", job_id: str) -> None:
+        self._manager = manager
+        self.job_id = job_id
+
+    @property
+    def cancelled(self) -> bool:
+        return self._manager._peek(self.job_id, "cancel_requested")
+
+    def progress(self, fraction: Optional[float], message: Optional[str] = None) -> None:
+        """Report progress in [0, 1]; pass None when only the message changes."""
+
+        def apply(job: Job) -> None:
+            if fraction is not None:
+                job.progress = min(max(fraction, 0.0), 1.0)
+            if message is not None:
+                job.message = message
+
+        self._manager._update(self.job_id, apply)
+
+    def emit(self, item: Any) -> None:
+        """Publish one partial result (a finished chapter, page, file...)."""
+        self._manager._update(self.job_id, lambda job: job.items.append(item))
+
+
+class JobManager:
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS, ttl: float = DEFAULT_TTL) -> None:
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, name: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> str:
+        """Queue ``fn(context, *args, **kwargs)`` and return the new job's ID."""
+        self._prune()
+        job = Job(id=uuid.uuid4().hex, name=name)
+        with self._lock:
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job.id, fn, args, kwargs)
+        return job.id
+
+    def _run(self, job_id: str, fn: Callable[..., Any], args: tuple, kwargs: dict) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            if job.cancel_requested:
+                job.status, job.finished = CANCELLED, time.time()
+                return
+            job.status, job.started = RUNNING, time.time()
+
+        try:
+            result = fn(JobContext(self, job_id), *args, **kwargs)
+        except Exception as exc:
+            logger.exception("Job %s (%s) failed", job_id, job.name)
+            self._finish(job_id, FAILED, error=str(exc))
+        else:
+            status = CANCELLED if self._peek(job_id, "cancel_requested") else DONE
+            self._finish(job_id, status, result=result)
+
+    def _finish(self, job_id: str, status: str, result: Any = None, error: Optional[str] = None) -> None:
+        def apply(job: Job) -> None:
+            job.status = status
+            job.result = result
+            job.error = error
+            job.finished = time.time()
+            if status == DONE:
+                job.progress = 1.0
+
+        self._update(job_id, apply)
+
+    def _update(self, job_id: str, apply: Callable[[Job], None]) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                apply(job)
+
+    def _peek(self, job_id: str, attribute: str) -> Any:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return getattr(job, attribute) if job is not None else None
+
+    def get(self, job_id: Optional[str]) -> Optional[Job]:
+        """Return a snapshot of the job, or None if it is unknown or expired."""
+        if not job_id:
+            return None
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return replace(job, items=list(job.items)) if job is not None else None
+
+    def cancel(self, job_id: str) -> None:
+        """Ask a job to stop; queued jobs never start, running ones must check ``cancelled``."""
+        self._update(job_id, lambda job: setattr(job, "cancel_requested", True))
+
+    def forget(self, job_id: str) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job.done:
+                del self._jobs[job_id]
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            expired = [
+                job_id
+                for job_id, job in self._jobs.items()
+                if job.done and job.finished is not None and job.finished < cutoff
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+    def shutdown(self) -> None:
+        with self._lock:
+            for job in self._jobs.values():
+                job.cancel_requested = True
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -1,37 +1,77 @@
-import shutil
+import io
 import zipfile
-import tempfile
-import os
 from pathlib import Path
-from typing import Tuple, Optional
+from typing import Optional
 import xml.etree.ElementTree as ET
 
 from pypdf import PdfReader, PdfWriter
 
+import xml_backend
+from buffers import Buffer, as_stream
+from zip_stream import read_members, rewrite_zip, write_members
+
+BLANK_PDF_METADATA = {
+    "/Title": "",
+    "/Author": "",
+    "/Subject": "",
+    "/Keywords": "",
+    "/Creator": "",
+    "/Producer": "",
+    "/CreationDate": "",
+    "/ModDate": "",
+    "/Trapped": "/False"
+}
+
+# Map of common namespaces in docProps. Registering them keeps the original
+# prefixes on output, which matters because core.xml refers to them inside
+# attribute values (xsi:type="dcterms:W3CDTF"). app.xml puts every element
+# in the extended-properties namespace, declared as the default one.
+DOCPROPS_NAMESPACES = {
+    'cp': 'http://schemas.openxmlformats.org/package/2006/metadata/core-properties',
+    'dc': 'http://purl.org/dc/elements/1.1/',
+    'dcterms': 'http://purl.org/dc/terms/',
+    'dcmitype': 'http://purl.org/dc/dcmitype/',
+    'xsi': 'http://www.w3.org/2001/XMLSchema-instance',
+    '': 'http://schemas.openxmlformats.org/officeDocument/2006/extended-properties',
+    'vt': 'http://schemas.openxmlformats.org/officeDocument/2006/docPropsVTypes',
+}
+
+for _prefix, _uri in DOCPROPS_NAMESPACES.items():
+    ET.register_namespace(_prefix, _uri)
+
+# docProps parts inside a PPTX and the tags scrubbed in each
+PPTX_DOCPROPS_TAGS = {
+    "docProps/core.xml": [
+        "creator", "lastModifiedBy", "created", "modified",
+        "title", "subject", "description", "keywords", "category"
+    ],
+    # app.xml often contains "Company", "Manager"
+    "docProps/app.xml": ["Company", "Manager"],
+}
+
+
+def _nuked_pdf_writer(reader: PdfReader) -> PdfWriter:
+    writer = PdfWriter()
+
+    for page in reader.pages:
+        writer.add_page(page)
+
+    nuke_writer_metadata(writer)
+    return writer
+
+def nuke_writer_metadata(writer: PdfWriter) -> None:
+    """
+    Set empty metadata on a writer that is about to be saved.
+    """
+    writer.add_metadata(BLANK_PDF_METADATA)
+
 def nuke_pdf_metadata(input_path: Path, output_path: Path) -> bool:
     """
     Removes metadata from a PDF file.
     Returns True if successful.
     """
     try:
-        reader = PdfReader(input_path)
-        writer = PdfWriter()
-
-        for page in reader.pages:
-            writer.add_page(page)
-
-        # Set empty metadata
-        writer.add_metadata({
-            "/Title": "",
-            "/Author": "",
-            "/Subject": "",
-            "/Keywords": "",
-            "/Creator": "",
-            "/Producer": "",
-            "/CreationDate": "",
-            "/ModDate": "",
-            "/Trapped": "/False"
-        })
+        writer = _nuked_pdf_writer(PdfReader(input_path))
 
         with open(output_path, "wb") as f:
             writer.write(f)
@@ -41,67 +81,80 @@ def nuke_pdf_metadata(input_path: Path, output_path: Path) -> bool:
         print(f"Error nuking PDF metadata: {e}")
         return False
 
+def nuke_pdf_metadata_buffer(data: Buffer) -> Optional[bytes]:
+    """
+    In-memory variant of nuke_pdf_metadata.
+    Returns the scrubbed PDF as bytes, or None on failure.
+    """
+    try:
+        writer = _nuked_pdf_writer(PdfReader(as_stream(data)))
+
+        output = io.BytesIO()
+        writer.write(output)
+        return output.getvalue()
+    except Exception as e:
+        print(f"Error nuking PDF metadata: {e}")
+        return None
+
 def nuke_pptx_metadata(input_path: Path, output_path: Path) -> bool:
     """
     Removes metadata from a PPTX file by modifying docProps/core.xml and app.xml.
+    The archive is streamed: only the docProps parts are decompressed and
+    scrubbed in memory, every other member is copied with its original
+    compression and in its original order.
     Returns True if successful.
     """
     try:
-        # PPTX is a zip file. We need to copy it to a new location, 
-        # but we can't just modify it in place easily with zipfile.
-        # So we'll unzip to a temp dir, modify, and re-zip.
-        
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
-            
-            # Extract all
-            with zipfile.ZipFile(input_path, 'r') as zip_ref:
-                zip_ref.extractall(temp_path)
-            
-            # Modify core.xml
-            core_xml_path = temp_path / "docProps" / "core.xml"
-            if core_xml_path.exists():
-                _scrub_xml(core_xml_path, [
-                    "creator", "lastModifiedBy", "created", "modified", 
-                    "title", "subject", "description", "keywords", "category"
-                ])
-
-            # Modify app.xml (often contains "Company", "Manager")
-            app_xml_path = temp_path / "docProps" / "app.xml"
-            if app_xml_path.exists():
-                _scrub_xml(app_xml_path, ["Company", "Manager"])
-
-            # Re-zip
-            with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zip_out:
-                for file_path in temp_path.rglob("*"):
-                    if file_path.is_file():
-                        arcname = file_path.relative_to(temp_path)
-                        zip_out.write(file_path, arcname)
-                        
+        with zipfile.ZipFile(input_path, 'r') as zin:
+            replacements = scrub_docprops(zin)
+
+        rewrite_zip(Path(input_path), Path(output_path), replacements)
         return True
     except Exception as e:
         print(f"Error nuking PPTX metadata: {e}")
         return False
 
-def _scrub_xml(file_path: Path, tags_to_scrub: list[str]):
+def nuke_pptx_metadata_buffer(data: Buffer) -> Optional[bytes]:
+    """
+    In-memory variant of nuke_pptx_metadata.
+    Only the docProps parts are rewritten; every other member is copied
+    with its original compression. Returns the scrubbed PPTX as bytes,
+    or None on failure.
+    """
+    try:
+        with zipfile.ZipFile(as_stream(data), 'r') as zin:
+            replacements = scrub_docprops(zin)
+
+            output = io.BytesIO()
+            with zipfile.ZipFile(output, 'w') as zout:
+                write_members(zin, zout, replacements)
+        return output.getvalue()
+    except Exception as e:
+        print(f"Error nuking PPTX metadata: {e}")
+        return None
+
+def scrub_docprops(zin: zipfile.ZipFile) -> dict:
     """
-    Helper to scrub specific tags from an XML file.
+    Scrub the docProps parts of an open PPTX; returns replacements for zip_stream.
+    """
+    docprops = read_members(zin, lambda name: name in PPTX_DOCPROPS_TAGS)
+    return {
+        name: _scrub_xml_bytes(content, PPTX_DOCPROPS_TAGS[name], name)
+        for name, content in docprops.items()
+    }
+
+def _scrub_xml_bytes(data: bytes, tags_to_scrub: list[str], label=None) -> bytes:
+    """
+    Helper to scrub specific tags from an XML document held in memory.
     It's a bit naive (just replaces text content), but effective for standard Office XML.
+    Returns the original bytes unchanged if the XML cannot be parsed.
     """
     try:
         # We use a namespace-aware approach or just brute-force it since namespaces vary.
         # For simplicity and robustness against namespace variations in Office, 
         # let's parse, iterate, and clear text.
         
-        tree = ET.parse(file_path)
-        root = tree.getroot()
-        
-        # Map of common namespaces in docProps
-        namespaces = {
-            'dc': 'http://purl.org/dc/elements/1.1/',
-            'cp': 'http://schemas.openxmlformats.org/package/2006/metadata/core-properties',
-            'dcterms': 'http://purl.org/dc/terms/'
-        }
+        root = xml_backend.parse(data)
         
         # Helper to strip namespace for checking localname
         def get_local_name(tag):
@@ -119,7 +172,8 @@ def _scrub_xml(file_path: Path, tags_to_scrub: list[str]):
                 if local_name in ["created", "modified"]:
                     elem.text = "1970-01-01T00:00:00Z"
 
-        tree.write(file_path, encoding='UTF-8', xml_declaration=True)
+        return xml_backend.tostring(root, encoding='UTF-8')
         
     except Exception as e:
-        print(f"Warning: Failed to scrub XML {file_path}: {e}")
+        print(f"Warning: Failed to scrub XML {label or 'document'}: {e}")
+        return data
@@ -0,0 +1,137 @@
+"""
+Incremental image-to-PDF writer.
+
+``PIL.Image.save(save_all=True)`` needs every page decoded in memory at
+once. ``ImagePdfWriter`` instead appends one page per image straight to the
+output file and forgets it, keeping only the byte offsets needed for the
+cross-reference table. Baseline JPEGs in gray or RGB are embedded as-is
+(``/DCTDecode``) without being decoded; anything else is converted and
+re-encoded to JPEG, which is what Pillow's PDF plugin does as well.
+"""
+
+from __future__ import annotations
+
+import io
+import zlib
+from typing import BinaryIO, List, Optional, Tuple
+
+from PIL import Image
+
+DEFAULT_RESOLUTION = 100.0
+JPEG_QUALITY = 90
+# JPEG modes a PDF viewer can draw from the raw stream without extra hints.
+PASSTHROUGH_MODES = {"L": "/DeviceGray", "RGB": "/DeviceRGB"}
+# Object 1 is the catalog and object 2 the page tree; both are written last
+# but their numbers are reserved so every page can point at its parent.
+CATALOG_ID = 1
+PAGES_ID = 2
+
+
+def _jpeg_image(data: bytes) -> Tuple[bytes, int, int, str]:
+    """Return ``(jpeg bytes, width, height, colour space)`` for one image."""
+    with Image.open(io.BytesIO(data)) as img:
+        # Image.open only parses the header, so the pass-through path never
+        # decodes the pixels.
+        if img.format == "JPEG" and img.mode in PASSTHROUGH_MODES:
+            return data, img.width, img.height, PASSTHROUGH_MODES[img.mode]
+
+        if img.mode not in PASSTHROUGH_MODES:
+            img = img.convert("RGB")
+        encoded = io.BytesIO()
+        img.save(encoded, "JPEG", quality=JPEG_QUALITY)
+        return encoded.getvalue(), img.width, img.height, PASSTHROUGH_MODES[img.mode]
+
+
+class ImagePdfWriter:
+    """Write a PDF with one full-page image per page, one page at a time."""
+
+    def __init__(self, fh: BinaryIO, resolution: float = DEFAULT_RESOLUTION) -> None:
+        self.fh = fh
+        self.scale = 72.0 / resolution
+        self._offsets: List[int] = []
+        self._page_ids: List[int] = []
+        self._next_id = PAGES_ID + 1
+        self._closed = False
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    @property
+    def page_count(self) -> int:
+        return len(self._page_ids)
+
+    def _write(self, data: bytes) -> None:
+        self.fh.write(data)
+
+    def _offset_slot(self, obj_id: int) -> None:
+        while len(self._offsets) < obj_id:
+            self._offsets.append(0)
+        self._offsets[obj_id - 1] = self.fh.tell()
+
+    def _allocate(self) -> int:
+        obj_id = self._next_id
+        self._next_id += 1
+        return obj_id
+
+    def _write_object(self, obj_id: int, body: bytes, stream: Optional[bytes] = None) -> None:
+        self._offset_slot(obj_id)
+        self._write(b"%d 0 obj\n" % obj_id + body)
+        if stream is not None:
+            self._write(b"\nstream\n")
+            self._write(stream)
+            self._write(b"\nendstream")
+        self._write(b"\nendobj\n")
+
+    def add_image(self, data: bytes) -> None:
+        """Append ``data`` (any format Pillow can open) as a new page."""
+        jpeg, width, height, colorspace = _jpeg_image(data)
+        page_w = width * self.scale
+        page_h = height * self.scale
+
+        image_id, content_id, page_id = self._allocate(), self._allocate(), self._allocate()
+        self._write_object(
+            image_id,
+            b"<< /Type /XObject /Subtype /Image /Width %d /Height %d "
+            b"/ColorSpace %s /BitsPerComponent 8 /Filter /DCTDecode /Length %d >>"
+            % (width, height, colorspace.encode("ascii"), len(jpeg)),
+            jpeg,
+        )
+        content = zlib.compress(b"q %.4f 0 0 %.4f 0 0 cm /Im0 Do Q" % (page_w, page_h))
+        self._write_object(
+            content_id,
+            b"<< /Filter /FlateDecode /Length %d >>" % len(content),
+            content,
+        )
+        self._write_object(
+            page_id,
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %.4f %.4f] "
+            b"/Resources << /XObject << /Im0 %d 0 R >> >> /Contents %d 0 R >>"
+            % (PAGES_ID, page_w, page_h, image_id, content_id),
+        )
+        self._page_ids.append(page_id)
+
+    def close(self) -> None:
+        """Write the page tree, catalog, cross-reference table and trailer."""
+        if self._closed:
+            return
+        self._closed = True
+        kids = b" ".join(b"%d 0 R" % page_id for page_id in self._page_ids)
+        self._write_object(
+            PAGES_ID,
+            b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(self._page_ids)),
+        )
+        self._write_object(CATALOG_ID, b"<< /Type /Catalog /Pages %d 0 R >>" % PAGES_ID)
+
+        xref_offset = self.fh.tell()
+        size = len(self._offsets) + 1
+        lines = [b"xref\n0 %d\n" % size, b"0000000000 65535 f \n"]
+        lines.extend(b"%010d 00000 n \n" % offset for offset in self._offsets)
+        self._write(b"".join(lines))
+        self._write(
+            b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+            % (size, CATALOG_ID, xref_offset)
+        )
+
+    def __enter__(self) -> "ImagePdfWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -2,21 +2,28 @@
 """
 Utility to strip the "Made with GAMMA" watermark from a PPTX file.
 
+The watermark is a picture in a slide layout whose click action links to
+gamma.app, so ``find_gamma_layouts`` can reject other decks by reading only
+the ZIP central directory and the layout ``.rels`` parts.
+
 Usage:
     PPTX_FILE=/absolute/path/to/deck.pptx python3 remove_gamma_logo.py
 """
 
 from __future__ import annotations
 
+import io
 import os
-import shutil
 import sys
-import tempfile
 import zipfile
 from pathlib import Path
-from typing import Dict, Set, Tuple
+from typing import Dict, Optional, Set, Tuple, Union
 import xml.etree.ElementTree as ET
 
+import xml_backend
+from buffers import Buffer, as_stream
+from zip_stream import rewrite_zip, write_members
+
 
 NS = {
     "a": "http://schemas.openxmlformats.org/drawingml/2006/main",
@@ -25,7 +32,12 @@ NS = {
 }
 
 PIC_TAG = f"{{{NS['p']}}}pic"
+HLINK_CLICK_TAG = f"{{{NS['a']}}}hlinkClick"
+BLIP_TAG = f"{{{NS['a']}}}blip"
+REL_ID_ATTR = f"{{{NS['r']}}}id"
+REL_EMBED_ATTR = f"{{{NS['r']}}}embed"
 ENV_VAR = "PPTX_FILE"
+GAMMA_HOST = "gamma.app"
 
 for prefix, uri in NS.items():
     ET.register_namespace(prefix, uri)
@@ -36,14 +48,56 @@ def fail(message: str) -> None:
     sys.exit(1)
 
 
-def load_archive(path: Path) -> Tuple[Dict[str, zipfile.ZipInfo], Dict[str, bytes]]:
-    infos: Dict[str, zipfile.ZipInfo] = {}
-    contents: Dict[str, bytes] = {}
-    with zipfile.ZipFile(path, "r") as zin:
-        for info in zin.infolist():
-            infos[info.filename] = info
-            contents[info.filename] = zin.read(info.filename)
-    return infos, contents
+def is_layout_part(name: str) -> bool:
+    return name.startswith("ppt/slideLayouts/") and (
+        name.endswith(".xml") or name.endswith(".xml.rels")
+    )
+
+
+def layout_rels_name(layout_name: str) -> str:
+    return f"ppt/slideLayouts/_rels/{Path(layout_name).name}.rels"
+
+
+def is_gamma_hyperlink(rel: ET.Element) -> bool:
+    return (
+        "hyperlink" in rel.get("Type", "")
+        and GAMMA_HOST in rel.get("Target", "").lower()
+        and bool(rel.get("Id"))
+    )
+
+
+def has_gamma_hyperlink(rel_bytes: bytes) -> bool:
+    # Most relationship parts never mention the host, so skip parsing those.
+    if GAMMA_HOST.encode("ascii") not in rel_bytes.lower():
+        return False
+    return any(is_gamma_hyperlink(rel) for rel in ET.fromstring(rel_bytes))
+
+
+def find_gamma_layouts(zin: zipfile.ZipFile) -> Dict[str, bytes]:
+    """
+    Map each slide layout that links to gamma.app to its relationship part.
+
+    Only the layout ``.rels`` members are decompressed; the names come from
+    the central directory that ``ZipFile`` has already read.
+    """
+    names = set(zin.namelist())
+    found: Dict[str, bytes] = {}
+    for layout_name in zin.namelist():
+        if not (is_layout_part(layout_name) and layout_name.endswith(".xml")):
+            continue
+        rel_name = layout_rels_name(layout_name)
+        if rel_name not in names:
+            continue
+        rel_bytes = zin.read(rel_name)
+        if has_gamma_hyperlink(rel_bytes):
+            found[layout_name] = rel_bytes
+    return found
+
+
+def detect_pptx(source: Union[Path, Buffer]) -> bool:
+    """Whether the deck at ``source`` (a path or buffer) carries the watermark."""
+    with zipfile.ZipFile(source if isinstance(source, (str, Path)) else as_stream(source), "r") as zin:
+        return bool(find_gamma_layouts(zin))
 
 
 def strip_gamma_from_layout(
@@ -57,13 +111,7 @@ def strip_gamma_from_layout(
     if rel_bytes:
         rel_tree = ET.fromstring(rel_bytes)
         for rel in list(rel_tree):
-            rel_type = rel.get("Type", "")
-            target = rel.get("Target", "")
-            if (
-                "hyperlink" in rel_type
-                and "gamma.app" in target.lower()
-                and rel.get("Id")
-            ):
+            if is_gamma_hyperlink(rel):
                 gamma_hlink_ids.add(rel.get("Id"))
                 rel_tree.remove(rel)
                 changed = True
@@ -71,30 +119,17 @@ def strip_gamma_from_layout(
     if not gamma_hlink_ids:
         return layout_bytes, rel_bytes, changed
 
-    layout_tree = ET.fromstring(layout_bytes)
+    layout_tree, pics = xml_backend.find_with_parents(layout_bytes, PIC_TAG)
     embed_ids_to_remove: Set[str] = set()
 
-    def should_remove(pic) -> bool:
-        for hlink in pic.findall(".//a:hlinkClick", NS):
-            rid = hlink.get(f"{{{NS['r']}}}id")
-            if rid in gamma_hlink_ids:
-                return True
-        return False
-
-    def walk(parent):
-        nonlocal changed
-        for child in list(parent):
-            walk(child)
-        for child in list(parent):
-            if child.tag == PIC_TAG and should_remove(child):
-                for blip in child.findall(".//a:blip", NS):
-                    rid = blip.get(f"{{{NS['r']}}}embed")
-                    if rid:
-                        embed_ids_to_remove.add(rid)
-                parent.remove(child)
-                changed = True
-
-    walk(layout_tree)
+    for parent, pic in pics:
+        if any(hlink.get(REL_ID_ATTR) in gamma_hlink_ids for hlink in pic.iter(HLINK_CLICK_TAG)):
+            for blip in pic.iter(BLIP_TAG):
+                rid = blip.get(REL_EMBED_ATTR)
+                if rid:
+                    embed_ids_to_remove.add(rid)
+            parent.remove(pic)
+            changed = True
 
     if not changed:
         return layout_bytes, rel_bytes, False
@@ -104,75 +139,91 @@ def strip_gamma_from_layout(
             if rel.get("Id") in embed_ids_to_remove:
                 rel_tree.remove(rel)
 
-    new_layout = ET.tostring(layout_tree, encoding="utf-8", xml_declaration=True)
+    new_layout = xml_backend.tostring(layout_tree)
     new_rels = (
-        ET.tostring(rel_tree, encoding="utf-8", xml_declaration=True)
+        xml_backend.tostring(rel_tree)
         if rel_tree is not None
         else rel_bytes
     )
     return new_layout, new_rels, True
 
 
-def write_archive(
-    path: Path,
-    infos: Dict[str, zipfile.ZipInfo],
-    contents: Dict[str, bytes],
-) -> None:
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".pptx") as tmp:
-        tmp_path = Path(tmp.name)
-    try:
-        with zipfile.ZipFile(tmp_path, "w") as zout:
-            for name, info in infos.items():
-                zout.writestr(info, contents[name])
-            for name, info in infos.items():
-                zout.writestr(info, contents[name])
-        shutil.move(str(tmp_path), str(path))
-    finally:
-        if tmp_path.exists():
-            tmp_path.unlink(missing_ok=True)
-
-
-def main() -> None:
-    pptx_path = os.getenv(ENV_VAR)
-    if not pptx_path:
-        fail(f"{ENV_VAR} environment variable is not set.")
-
-    path = Path(pptx_path).expanduser()
-    if not path.exists():
-        fail(f"PPTX file not found: {path}")
-
-    infos, contents = load_archive(path)
-    layout_names = [
-        name
-        for name in contents
-        if name.startswith("ppt/slideLayouts/") and name.endswith(".xml")
-    ]
+def collect_layout_edits(zin: zipfile.ZipFile) -> Tuple[Dict[str, Optional[bytes]], int]:
+    """
+    Strip the watermark from every slide layout in ``zin``.
 
+    Only the layout relationship files, and the layout XML of layouts that
+    link to gamma.app, are decompressed. Returns the member replacements
+    for ``zip_stream`` and the number of layouts that changed.
+    """
+    replacements: Dict[str, Optional[bytes]] = {}
     total_removed = 0
 
-    for layout_name in layout_names:
-        rel_name = f"ppt/slideLayouts/_rels/{Path(layout_name).name}.rels"
-        layout_bytes = contents[layout_name]
-        rel_bytes = contents.get(rel_name)
+    for layout_name, rel_bytes in find_gamma_layouts(zin).items():
+        rel_name = layout_rels_name(layout_name)
 
         new_layout, new_rels, changed = strip_gamma_from_layout(
-            layout_bytes, rel_bytes
+            zin.read(layout_name), rel_bytes
         )
 
         if changed:
-            contents[layout_name] = new_layout
+            replacements[layout_name] = new_layout
             if new_rels is not None:
-                contents[rel_name] = new_rels
-            elif rel_name in contents:
-                del contents[rel_name]
-                del infos[rel_name]
+                replacements[rel_name] = new_rels
             total_removed += 1
 
+    return replacements, total_removed
+
+
+def process_pptx(src: Path, dest: Path) -> int:
+    """
+    Write a watermark-free copy of ``src`` to ``dest`` (which may be ``src``).
+
+    Returns the number of layouts cleaned; ``dest`` is left untouched when
+    nothing matched.
+    """
+    with zipfile.ZipFile(src, "r") as zin:
+        replacements, total_removed = collect_layout_edits(zin)
+
+    if total_removed == 0:
+        return 0
+
+    rewrite_zip(src, dest, replacements)
+    return total_removed
+
+
+def process_pptx_buffer(data: Buffer) -> Tuple[Optional[bytes], int]:
+    """
+    In-memory variant of ``process_pptx``.
+
+    Returns the cleaned deck as bytes (None when nothing matched) and the
+    number of layouts cleaned.
+    """
+    with zipfile.ZipFile(as_stream(data), "r") as zin:
+        replacements, total_removed = collect_layout_edits(zin)
+        if total_removed == 0:
+            return None, 0
+
+        output = io.BytesIO()
+        with zipfile.ZipFile(output, "w") as zout:
+            write_members(zin, zout, replacements)
+    return output.getvalue(), total_removed
+
+
+def main() -> None:
+    pptx_path = os.getenv(ENV_VAR)
+    if not pptx_path:
+        fail(f"{ENV_VAR} environment variable is not set.")
+
+    path = Path(pptx_path).expanduser()
+    if not path.exists():
+        fail(f"PPTX file not found: {path}")
+
+    total_removed = process_pptx(path, path)
     if total_removed == 0:
         print("No Gamma watermark found; no changes made.")
         return
 
-    write_archive(path, infos, contents)
     print(f"Removed Gamma watermark from {total_removed} layout(s).")
 
 
@@ -1,65 +1,333 @@
 import requests
-from bs4 import BeautifulSoup
-from PIL import Image
-from io import BytesIO
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import islice
+from urllib.parse import urlsplit
+import json
 import os
+import shutil
+import tempfile
+import threading
 
-def download_and_create_pdf(url, output_pdf_name):
-    print(f"Fetching content from {url}...")
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Safari/537.36'
-    }
-    
-    try:
-        response = requests.get(url, headers=headers)
+from http_cache import HttpCache
+from image_extract import CHAPTER_END_TAG, extract_image_urls
+from pdf_assembler import ImagePdfWriter
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Safari/537.36'
+}
+REQUEST_TIMEOUT = 30
+# Images fetched at once across all chapters, and at most this many per host
+MAX_IMAGE_WORKERS = 8
+PER_HOST_LIMIT = 4
+# Chapters processed at once; their images share the pool above
+MAX_CHAPTER_WORKERS = 3
+# Images downloaded ahead of the page being written, per chapter
+PAGE_WINDOW = 4
+RETRIES = 3
+RETRY_BACKOFF = 0.5
+# Attempts per image in one run; pages still missing are retried on the next run
+IMAGE_ATTEMPTS = 3
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Pages and images are revalidated against this cache on later runs
+HTTP_CACHE_DIR = os.getenv(
+    "SAKAMOTO_CACHE_DIR", os.path.join(tempfile.gettempdir(), "gammaverse-http")
+)
+HTTP_CACHE_MAX_MB = int(os.getenv("SAKAMOTO_CACHE_MB", "1024"))
+# Backend from image_extract.EXTRACTORS used to find the page images
+IMAGE_EXTRACTOR = os.getenv("SAKAMOTO_IMAGE_EXTRACTOR", "stream")
+
+
+class Fetcher:
+    """
+    Shared HTTP engine: one pooled session, a bounded thread pool for image
+    downloads, a concurrency cap per host and retries with exponential backoff.
+    With an HttpCache, bodies are fetched with conditional requests.
+    """
+
+    def __init__(self, max_workers=MAX_IMAGE_WORKERS, per_host=PER_HOST_LIMIT,
+                 retries=RETRIES, backoff=RETRY_BACKOFF, timeout=REQUEST_TIMEOUT,
+                 cache=None):
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(["GET"]),
+        )
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.per_host = per_host
+        self.timeout = timeout
+        self.cache = cache
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._host_limits = {}
+        self._lock = threading.Lock()
+
+    def _host_limit(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(self.per_host)
+            return self._host_limits[host]
+
+    def get(self, url, headers=None):
+        with self._host_limit(url):
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
         response.raise_for_status()
-    except Exception as e:
-        print(f"Failed to fetch page: {e}")
-        return
+        return response
 
-    soup = BeautifulSoup(response.content, 'html.parser')
-    
-    # Find all images with 'wp-image' in their class, as discovered
-    all_imgs = soup.find_all('img')
-    image_urls = []
-    for img in all_imgs:
-        classes = img.get('class', [])
-        if any('wp-image' in c for c in classes):
-            if img.get('src'):
-                image_urls.append(img['src'])
-    
-    if not image_urls:
-        print("No images found with the expected class.")
-        return
+    def fetch(self, url):
+        """Return the body of url, revalidating a cached copy if there is one."""
+        if self.cache is None:
+            return self.get(url).content
+        return self.cache.fetch(url, lambda headers: self.get(url, headers))
+
+    def submit(self, url):
+        return self.executor.submit(self.fetch, url)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def default_http_cache():
+    return HttpCache(HTTP_CACHE_DIR, max_bytes=HTTP_CACHE_MAX_MB * 1024 * 1024)
 
-    print(f"Found {len(image_urls)} images. Downloading...")
 
-    images = []
-    for i, img_url in enumerate(image_urls):
+def chapter_filename(url):
+    # e.g., "https://sakamotodays.org/comic/sakamoto-days-chapter-97/" -> "sakamoto-days-chapter-97"
+    slug = url.strip('/').split('/')[-1]
+    # e.g., "sakamoto-days-chapter-97" -> "Sakamoto_Days_Chapter_97.pdf"
+    return slug.replace('-', '_').title() + ".pdf"
+
+
+class ChapterCheckpoint:
+    """
+    Resume state for one chapter PDF, kept next to it:
+
+        Chapter_97.pdf.state.json   source URL, image URLs, finished pages
+                                    and whether the PDF was completed
+        Chapter_97.pdf.pages/       one file per downloaded page image,
+                                    removed once the PDF is written
+
+    Every file is written to a temporary name and renamed into place, so an
+    interrupted run never leaves a half-written page, state file or PDF.
+    A PDF counts as finished only if its state file says so for the same URL,
+    and it is only written once every page is on disk.
+    """
+
+    def __init__(self, output_pdf_name):
+        self.output_pdf_name = output_pdf_name
+        self.state_path = output_pdf_name + ".state.json"
+        self.pages_dir = output_pdf_name + ".pages"
+        self.state = None
+
+    def load(self, url):
         try:
-            print(f"Downloading image {i+1}/{len(image_urls)}: {img_url}")
-            img_response = requests.get(img_url, headers=headers)
-            img_response.raise_for_status()
-            
-            img_data = BytesIO(img_response.content)
-            img = Image.open(img_data)
-            
-            # Convert to RGB to ensure compatibility with PDF (remove alpha channel if png)
-            if img.mode in ("RGBA", "P"):
-                img = img.convert("RGB")
-                
-            images.append(img)
-        except Exception as e:
-            print(f"Error downloading image {img_url}: {e}")
+            with open(self.state_path, encoding="utf-8") as fh:
+                state = json.load(fh)
+        except (OSError, ValueError):
+            return False
+        if state.get("url") != url or not state.get("images"):
+            return False
+        if not state.get("complete"):
+            # Trust only pages whose files actually made it to disk.
+            state["done"] = [i for i in state.get("done", []) if os.path.exists(self.page_path(i))]
+        self.state = state
+        return True
 
-    if images:
-        print(f"Saving {len(images)} images to {output_pdf_name}...")
-        images[0].save(
-            output_pdf_name, "PDF", resolution=100.0, save_all=True, append_images=images[1:]
-        )
-        print("PDF created successfully!")
+    def start(self, url, image_urls):
+        self.state = {
+            "url": url,
+            "images": list(image_urls),
+            "done": [],
+            "complete": False,
+        }
+        os.makedirs(self.pages_dir, exist_ok=True)
+        self._save()
+
+    @property
+    def image_urls(self):
+        return self.state["images"]
+
+    @property
+    def complete(self):
+        return bool(self.state.get("complete"))
+
+    def missing(self):
+        done = set(self.state["done"])
+        return [i for i in range(len(self.image_urls)) if i not in done]
+
+    def page_path(self, index):
+        return os.path.join(self.pages_dir, f"{index:04d}.img")
+
+    def mark_done(self, index, data):
+        _write_atomic(self.page_path(index), data)
+        self.state["done"].append(index)
+        self._save()
+
+    def finalize(self):
+        """Assemble the staged pages into the PDF and record it as complete."""
+        part_path = self.output_pdf_name + ".part"
+        try:
+            with open(part_path, "wb") as fh, ImagePdfWriter(fh, resolution=100.0) as pdf:
+                for index in range(len(self.image_urls)):
+                    try:
+                        with open(self.page_path(index), "rb") as page:
+                            pdf.add_image(page.read())
+                    except Exception:
+                        # Fetch this page again on the next run.
+                        self.state["done"].remove(index)
+                        self._save()
+                        raise
+            os.replace(part_path, self.output_pdf_name)
+        finally:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+        self.state["complete"] = True
+        self._save()
+        shutil.rmtree(self.pages_dir, ignore_errors=True)
+
+    def _save(self):
+        _write_atomic(self.state_path, json.dumps(self.state).encode("utf-8"))
+
+
+def _write_atomic(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp_path, path)
+
+
+def _output_lock(output_pdf_name):
+    with _output_locks_guard:
+        return _output_locks.setdefault(os.path.abspath(output_pdf_name), threading.Lock())
+
+
+_output_locks = {}
+_output_locks_guard = threading.Lock()
+
+
+def download_and_create_pdf(url, output_pdf_name, fetcher=None):
+    if fetcher is None:
+        with Fetcher() as own_fetcher:
+            return download_and_create_pdf(url, output_pdf_name, own_fetcher)
+
+    # Two callers asking for the same chapter must not share its checkpoint.
+    with _output_lock(output_pdf_name):
+        return _download_chapter(url, output_pdf_name, fetcher)
+
+
+def _download_chapter(url, output_pdf_name, fetcher):
+    checkpoint = ChapterCheckpoint(output_pdf_name)
+    resumed = checkpoint.load(url)
+    if resumed and checkpoint.complete and os.path.exists(output_pdf_name):
+        print(f"{output_pdf_name} is already complete, skipping {url}.")
+        return True
+    if resumed and not checkpoint.complete:
+        print(f"Resuming {url}: {len(checkpoint.missing())} of {len(checkpoint.image_urls)} images left.")
     else:
-        print("No images successfully downloaded.")
+        print(f"Fetching content from {url}...")
+
+        try:
+            page = fetcher.fetch(url)
+        except Exception as e:
+            print(f"Failed to fetch page: {e}")
+            return False
+
+        image_urls = extract_image_urls(page, url, IMAGE_EXTRACTOR, stop_tag=CHAPTER_END_TAG)
+
+        if not image_urls:
+            print("No images found with the expected class.")
+            return False
+
+        print(f"Found {len(image_urls)} images. Downloading...")
+        checkpoint.start(url, image_urls)
+
+    # Only a few images are in flight at a time. Each one is staged on disk
+    # and checkpointed as soon as it arrives, so memory stays bounded by the
+    # window and an interrupted run resumes from the last finished page.
+    image_urls = checkpoint.image_urls
+    missing = checkpoint.missing()
+    pending = deque()
+    attempts = {}
+    next_index = iter(missing)
+    for i in islice(next_index, PAGE_WINDOW):
+        pending.append((i, fetcher.submit(image_urls[i])))
+
+    try:
+        while pending:
+            i, future = pending.popleft()
+            for queued in islice(next_index, 1):
+                pending.append((queued, fetcher.submit(image_urls[queued])))
+            try:
+                checkpoint.mark_done(i, future.result())
+                print(f"Downloaded image {i+1}/{len(image_urls)}: {image_urls[i]}")
+            except Exception as e:
+                attempts[i] = attempts.get(i, 0) + 1
+                if attempts[i] >= IMAGE_ATTEMPTS:
+                    print(f"Error downloading image {image_urls[i]}: {e}; giving up for this run.")
+                else:
+                    print(f"Error downloading image {image_urls[i]}: {e}; retrying.")
+                    pending.append((i, fetcher.submit(image_urls[i])))
+    finally:
+        for _, future in pending:
+            future.cancel()
+
+    # A chapter PDF is never written with pages left out.
+    left = len(checkpoint.missing())
+    if left:
+        print(f"{left} image(s) still missing; re-run to resume {url}.")
+        return False
+
+    print(f"Saving {len(image_urls)} images to {output_pdf_name}...")
+    checkpoint.finalize()
+    print("PDF created successfully!")
+    return True
+
+
+def iter_chapter_downloads(urls, output_dir=".", max_chapters=MAX_CHAPTER_WORKERS, fetcher=None):
+    """
+    Download several chapters concurrently, sharing one Fetcher.
+    Yields (index, url, output_path or None, error or None) as chapters finish.
+    """
+    if fetcher is None:
+        with Fetcher() as own_fetcher:
+            yield from iter_chapter_downloads(urls, output_dir, max_chapters, own_fetcher)
+        return
+
+    def run(url):
+        output_path = os.path.join(output_dir, chapter_filename(url))
+        if download_and_create_pdf(url, output_path, fetcher):
+            return output_path
+        return None
+
+    with ThreadPoolExecutor(max_workers=max_chapters) as chapters:
+        futures = {chapters.submit(run, url): (index, url) for index, url in enumerate(urls)}
+        try:
+            for future in as_completed(futures):
+                index, url = futures[future]
+                try:
+                    yield index, url, future.result(), None
+                except Exception as e:
+                    yield index, url, None, e
+        finally:
+            # If the caller stops early, chapters that have not started are dropped;
+            # running ones finish and keep their checkpoints.
+            for future in futures:
+                future.cancel()
+
 
 if __name__ == "__main__":
     target_urls = [
@@ -77,16 +345,11 @@ if __name__ == "__main__":
         "https://sakamotodays.org/comic/sakamoto-days-chapter-120/",
     ]
 
-    for url in target_urls:
-        try:
-            # Generate a dynamic output filename from the URL
-            # e.g., "https://sakamotodays.org/comic/sakamoto-days-chapter-97/" -> "sakamoto-days-chapter-97"
-            slug = url.strip('/').split('/')[-1]
-            # e.g., "sakamoto-days-chapter-97" -> "Sakamoto_Days_Chapter_97.pdf"
-            output_filename = slug.replace('-', '_').title() + ".pdf"
-            
-            download_and_create_pdf(url, output_filename)
-            print("-" * 50)
-        except Exception as e:
-            print(f"An error occurred while processing {url}: {e}")
+    with Fetcher(cache=default_http_cache()) as fetcher:
+        for index, url, output_path, error in iter_chapter_downloads(target_urls, fetcher=fetcher):
+            if error:
+                print(f"An error occurred while processing {url}: {error}")
+            elif output_path:
+                print(f"Finished {url} -> {output_path}")
             print("-" * 50)
+        print(f"HTTP cache: {fetcher.cache.stats()}")
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Single-pass "sanitize" pipeline: unlock, watermark removal and metadata nuke.
+
+Running the three tools one after another parses and re-serializes the
+document three times. Here the stages share one parsed document and the
+output is written once: PDFs go through a single PdfReader/PdfWriter, and
+PPTX watermark and metadata edits are fused into one ZIP rewrite.
+
+Usage:
+    python3 sanitize.py input.pdf output.pdf --password secret
+    python3 sanitize.py deck.pptx deck-clean.pptx --stages strip_watermark nuke_metadata
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import sys
+import zipfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from pypdf import PdfReader, PdfWriter
+
+import metadata_nuke
+import remove_gamma_logo as pptx_cleaner
+import remove_gamma_logo_pdf as pdf_cleaner
+from buffers import Buffer, as_bytes, as_stream
+from zip_stream import write_members
+
+STAGE_UNLOCK = "unlock"
+STAGE_STRIP_WATERMARK = "strip_watermark"
+STAGE_NUKE_METADATA = "nuke_metadata"
+# Stages always run in this order, whatever order they are requested in.
+STAGES = (STAGE_UNLOCK, STAGE_STRIP_WATERMARK, STAGE_NUKE_METADATA)
+
+
+class SanitizeError(Exception):
+    """Raised when a document cannot be sanitized with the given stages."""
+
+
+@dataclass
+class PdfJob:
+    """State shared by the PDF stages: one reader in, one writer out."""
+
+    reader: PdfReader
+    source: Optional[bytes] = None
+    password: Optional[str] = None
+    workers: int = 1
+    stages: Tuple[str, ...] = ()
+    writer: Optional[PdfWriter] = None
+    report: Dict[str, Any] = field(default_factory=dict)
+
+    def ensure_writer(self) -> PdfWriter:
+        if self.writer is None:
+            self.writer = PdfWriter()
+            for page in self.reader.pages:
+                self.writer.add_page(page)
+            if STAGE_NUKE_METADATA not in self.stages and self.reader.metadata:
+                self.writer.add_metadata(self.reader.metadata)
+        return self.writer
+
+
+def normalize_stages(stages: Iterable[str]) -> Tuple[str, ...]:
+    requested = set(stages)
+    unknown = requested.difference(STAGES)
+    if unknown:
+        raise SanitizeError(f"Unknown stage(s): {', '.join(sorted(unknown))}")
+    if not requested:
+        raise SanitizeError("At least one stage is required.")
+    return tuple(stage for stage in STAGES if stage in requested)
+
+
+def _pdf_unlock(job: PdfJob) -> None:
+    job.report["unlocked"] = False
+    if job.reader.is_encrypted:
+        if not job.reader.decrypt(job.password or ""):
+            raise SanitizeError("Could not decrypt the PDF. Incorrect password.")
+        job.report["unlocked"] = True
+
+
+def _pdf_strip_watermark(job: PdfJob) -> None:
+    if not pdf_cleaner.has_gamma_watermark(job.reader):
+        # Nothing to scrub; ensure_writer copies the pages if a later stage needs them.
+        job.report["watermark_removed"] = 0
+        return
+    # Worker processes re-open the raw bytes, which they cannot do for an
+    # encrypted file, so those are always scrubbed in-process.
+    source = None if job.reader.is_encrypted else job.source
+    job.writer, removed = pdf_cleaner.remove_watermark(
+        job.reader,
+        workers=job.workers,
+        source=source,
+        copy_metadata=STAGE_NUKE_METADATA not in job.stages,
+    )
+    job.report["watermark_removed"] = removed
+
+
+def _pdf_nuke_metadata(job: PdfJob) -> None:
+    metadata_nuke.nuke_writer_metadata(job.ensure_writer())
+    job.report["metadata_nuked"] = True
+
+
+PDF_STAGES: Dict[str, Callable[[PdfJob], None]] = {
+    STAGE_UNLOCK: _pdf_unlock,
+    STAGE_STRIP_WATERMARK: _pdf_strip_watermark,
+    STAGE_NUKE_METADATA: _pdf_nuke_metadata,
+}
+
+
+def sanitize_pdf_buffer(
+    data: Buffer,
+    stages: Iterable[str] = STAGES,
+    password: Optional[str] = None,
+    workers: int = 1,
+) -> Tuple[bytes, Dict[str, Any]]:
+    """Run the requested stages over one parsed PDF and serialize it once."""
+    stages = normalize_stages(stages)
+    source = as_bytes(data) if pdf_cleaner.resolve_workers(workers) > 1 else None
+    reader = PdfReader(io.BytesIO(source) if source is not None else as_stream(data))
+    if reader.is_encrypted and STAGE_UNLOCK not in stages:
+        raise SanitizeError("The PDF is encrypted; add the unlock stage and a password.")
+
+    job = PdfJob(reader, source, password, workers, stages)
+    for stage in stages:
+        PDF_STAGES[stage](job)
+
+    output = io.BytesIO()
+    job.ensure_writer().write(output)
+    return output.getvalue(), job.report
+
+
+def sanitize_pptx_buffer(
+    data: Buffer,
+    stages: Iterable[str] = STAGES,
+) -> Tuple[bytes, Dict[str, Any]]:
+    """Fuse the PPTX watermark and metadata edits into a single ZIP rewrite."""
+    stages = normalize_stages(stages)
+    report: Dict[str, Any] = {}
+    replacements: Dict[str, Optional[bytes]] = {}
+
+    with zipfile.ZipFile(as_stream(data), "r") as zin:
+        if STAGE_STRIP_WATERMARK in stages:
+            layout_edits, removed = pptx_cleaner.collect_layout_edits(zin)
+            replacements.update(layout_edits)
+            report["watermark_removed"] = removed
+        if STAGE_NUKE_METADATA in stages:
+            replacements.update(metadata_nuke.scrub_docprops(zin))
+            report["metadata_nuked"] = True
+
+        output = io.BytesIO()
+        with zipfile.ZipFile(output, "w") as zout:
+            write_members(zin, zout, replacements)
+    return output.getvalue(), report
+
+
+def sanitize_buffer(
+    data: Buffer,
+    kind: str,
+    stages: Iterable[str] = STAGES,
+    password: Optional[str] = None,
+    workers: int = 1,
+) -> Tuple[bytes, Dict[str, Any]]:
+    """Dispatch on ``kind`` ("pdf" or "pptx"; a leading dot is accepted)."""
+    kind = kind.lower().lstrip(".")
+    if kind == "pdf":
+        return sanitize_pdf_buffer(data, stages, password=password, workers=workers)
+    if kind == "pptx":
+        return sanitize_pptx_buffer(data, stages)
+    raise SanitizeError(f"Unsupported file type: {kind}")
+
+
+def sanitize_file(
+    src: Union[str, Path],
+    dest: Union[str, Path],
+    stages: Iterable[str] = STAGES,
+    password: Optional[str] = None,
+    workers: int = 1,
+) -> Dict[str, Any]:
+    src, dest = Path(src), Path(dest)
+    with open(src, "rb") as fh:
+        data, report = sanitize_buffer(
+            fh, src.suffix, stages, password=password, workers=workers
+        )
+    dest.write_bytes(data)
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Unlock, de-watermark and scrub a PDF or PPTX in one pass.")
+    parser.add_argument("input", help="PDF or PPTX to sanitize.")
+    parser.add_argument("output", help="Where to write the sanitized file.")
+    parser.add_argument(
+        "--stages",
+        nargs="+",
+        choices=STAGES,
+        default=list(STAGES),
+        help="Stages to run (default: all).",
+    )
+    parser.add_argument("--password", help="Password for encrypted PDFs.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes used for PDF watermark removal (0 = one per CPU).",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        report = sanitize_file(
+            args.input, args.output, args.stages, args.password, args.workers
+        )
+    except (SanitizeError, OSError, zipfile.BadZipFile) as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+    print(f"Sanitized {args.input} -> {args.output}: {report}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,16 +1,20 @@
-import shutil
+import importlib
 import tempfile
 import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
+from types import ModuleType
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
 
 import streamlit as st
 
-import export_iimjobs_applied as iimjobs_exporter
-import remove_gamma_logo as pptx_cleaner
-import remove_gamma_logo_pdf as pdf_cleaner
-import metadata_nuke
-import sakamoto_downloader
-import unlock_pdf
+from artifacts import ZIP_MIME, Artifact, store_artifact, store_bundle
+from disk_cache import DiskCache, make_key, secret_token
+from jobs import CANCELLED, FAILED, Job, JobContext, JobManager
+
+if TYPE_CHECKING:
+    from browser_pool import BrowserPool
+    from http_cache import HttpCache
 
 
 BASE_DIR = Path(__file__).resolve().parent
@@ -19,47 +23,335 @@ TOOL_IIMJOBS = "💼 IIMJobs Exporter"
 TOOL_METADATA = "🧹 Metadata Nuke"
 TOOL_UNLOCK_PDF = "🔓 Unlock PDF"
 TOOL_SAKAMOTO = "📚 Sakamoto Downloader"
+TOOL_SANITIZE = "🛡️ Sanitize"
+SANITIZE_STAGE_LABELS = {
+    "unlock": "Unlock (PDF only)",
+    "strip_watermark": "Remove Gamma watermark",
+    "nuke_metadata": "Nuke metadata",
+}
 IIMJOBS_DEFAULT_OUTPUT = "iimjobs_applied_jobs.csv"
+IIMJOBS_OUTPUT_TYPES = {
+    "csv": (".csv", "text/csv"),
+    "ndjson.gz": (".ndjson.gz", "application/gzip"),
+    "parquet": (".parquet", "application/vnd.apache.parquet"),
+}
+# Tool outputs and downloads, evicted by age and size
+RESULT_CACHE_DIR = Path(
+    os.getenv("GAMMAVERSE_CACHE_DIR", Path(tempfile.gettempdir()) / "gammaverse-results")
+)
+RESULT_CACHE_MAX_MB = int(os.getenv("GAMMAVERSE_CACHE_MB", "512"))
+RESULT_CACHE_MAX_AGE_HOURS = float(os.getenv("GAMMAVERSE_CACHE_HOURS", "24"))
+# Streamlit holds a whole download in memory while serving it; larger files are not offered
+DOWNLOAD_MAX_MB = int(os.getenv("GAMMAVERSE_DOWNLOAD_MAX_MB", "200"))
+# Chapter PDFs and their resume checkpoints; survives session restarts
+CHAPTER_DIR = Path(
+    os.getenv("GAMMAVERSE_CHAPTER_DIR", Path(tempfile.gettempdir()) / "gammaverse-chapters")
+)
+JOB_WORKERS = int(os.getenv("GAMMAVERSE_JOB_WORKERS", "4"))
+JOB_POLL_SECONDS = 1.0
+DEFAULT_BATCH_WORKERS = 4
+OUTPUT_MIME = {
+    ".pptx": "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+    ".pdf": "application/pdf",
+}
+
+
+def load_tool_module(name: str) -> ModuleType:
+    """
+    Import a tool's module the first time it is needed. Tool modules pull in
+    pypdf, PIL, requests or selenium, so none of them are imported at start-up;
+    later calls are served from sys.modules.
+    """
+    return importlib.import_module(name)
+
+
+def process_pptx(data) -> Tuple[Optional[bytes], int]:
+    return load_tool_module("remove_gamma_logo").process_pptx_buffer(data)
+
+
+def process_pdf(data, workers: int = 1) -> Tuple[Optional[bytes], int]:
+    return load_tool_module("remove_gamma_logo_pdf").process_pdf_buffer(data, workers=workers)
+
+
+@st.cache_resource
+def get_result_cache() -> DiskCache:
+    return DiskCache(
+        RESULT_CACHE_DIR,
+        max_bytes=RESULT_CACHE_MAX_MB * 1024 * 1024,
+        max_age=RESULT_CACHE_MAX_AGE_HOURS * 3600,
+    )
+
+
+@st.cache_resource
+def get_browser_pool(headless: bool) -> "BrowserPool":
+    """Warm Chrome instances shared by concurrent iimjobs exports."""
+    return load_tool_module("export_iimjobs_applied").make_browser_pool(headless=headless)
+
+
+@st.cache_resource
+def get_http_cache() -> "HttpCache":
+    """Downloaded chapter pages and images, shared by all sessions."""
+    sakamoto_downloader = load_tool_module("sakamoto_downloader")
+    cache_dir = os.getenv("GAMMAVERSE_HTTP_CACHE_DIR", sakamoto_downloader.HTTP_CACHE_DIR)
+    max_mb = int(os.getenv("GAMMAVERSE_HTTP_CACHE_MB", str(sakamoto_downloader.HTTP_CACHE_MAX_MB)))
+    return load_tool_module("http_cache").HttpCache(Path(cache_dir), max_bytes=max_mb * 1024 * 1024)
+
+
+@st.cache_resource
+def get_job_manager() -> JobManager:
+    """Background workers for long-running tools, shared by all sessions."""
+    return JobManager(max_workers=JOB_WORKERS)
+
+
+def render_job(job_key: str, render_results: Callable[[Job], None]) -> None:
+    """
+    Show the job whose ID is kept in ``st.session_state[job_key]``. While it
+    runs, a fragment polls it so only this part of the page reruns.
+    """
+    job = get_job_manager().get(st.session_state.get(job_key))
+    if job is None:
+        return
+    if job.done:
+        render_results(job)
+    else:
+        _poll_job(job_key, render_results)
+
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def _poll_job(job_key: str, render_results: Callable[[Job], None]) -> None:
+    job = get_job_manager().get(st.session_state.get(job_key))
+    if job is None or job.done:
+        # Rerun the whole page, which shows the final state and stops polling.
+        st.rerun()
+    st.progress(job.progress, text=job.message or "Waiting for a free worker...")
+    render_results(job)
+    if st.button("✖️ Cancel", key=f"{job_key}_cancel"):
+        get_job_manager().cancel(job.id)
+
+
+def run_cached(
+    tool: str,
+    uploaded_file,
+    options: Dict[str, Any],
+    process: Callable[[], Tuple[Optional[bytes], Dict[str, Any]]],
+) -> Tuple[Optional[Path], Dict[str, Any]]:
+    """
+    Return the output file for this upload, tool and options, computing it once.
+
+    ``process`` returns the output bytes (or None) and a metadata dict. The
+    bytes are written to the result cache and only its path is returned.
+    Results whose metadata has ``success`` set to False are not cached.
+    """
+    cache = get_result_cache()
+    key = make_key(uploaded_file.getbuffer(), tool, options)
+    entry = cache.get(key)
+    if entry is not None:
+        return (entry.path if entry.metadata.get("has_output") else None), entry.metadata
+
+    data, metadata = process()
+    if not metadata.get("success", True):
+        return None, metadata
+    entry = cache.put(key, data or b"", dict(metadata, has_output=data is not None))
+    return (entry.path if data is not None else None), metadata
+
+
+def download_file(label: str, path: Optional[Path], file_name: str, mime: str, **kwargs: Any) -> None:
+    """
+    ``st.download_button`` for a file on disk. The file is read only when the
+    button is clicked, so pages and session state hold a path, not the bytes.
+    Streamlit has no streaming download: its media file manager keeps the
+    whole file in memory while serving it, so files over ``DOWNLOAD_MAX_MB``
+    are refused instead of read.
+    """
+    if path is None or not path.exists():
+        st.info(f"{file_name} has expired from the cache; run the tool again.")
+        return
+    if too_large_to_download(file_name, path.stat().st_size):
+        return
+    st.download_button(
+        label, path.read_bytes, file_name=file_name, mime=mime, on_click="ignore", **kwargs
+    )
+
+
+def too_large_to_download(file_name: str, size: int) -> bool:
+    if size <= DOWNLOAD_MAX_MB * 1024 * 1024:
+        return False
+    st.warning(
+        f"{file_name} is {size / (1024 * 1024):.0f} MB, over the {DOWNLOAD_MAX_MB} MB download "
+        "limit (GAMMAVERSE_DOWNLOAD_MAX_MB)."
+    )
+    return True
+
+
+def download_artifact(label: str, artifact: Artifact, **kwargs: Any) -> None:
+    download_file(label, artifact.path, artifact.name, artifact.mime, **kwargs)
 
 
-def process_pptx(src: Path, dest: Path) -> int:
-    shutil.copy(src, dest)
-    infos, contents = pptx_cleaner.load_archive(dest)
-    layout_names = [
-        name
-        for name in contents
-        if name.startswith("ppt/slideLayouts/") and name.endswith(".xml")
-    ]
+def download_bundle(label: str, artifacts: List[Artifact], file_name: str, **kwargs: Any) -> None:
+    """
+    Offer several artifacts as one ZIP. The archive is written to the result
+    cache on the first click and served from there like any other file. It
+    is never smaller than the files in it by much, as most are compressed
+    already, so their total is checked against ``DOWNLOAD_MAX_MB`` up front.
+    """
+    size = sum(artifact.path.stat().st_size for artifact in artifacts if artifact.exists())
+    if too_large_to_download(file_name, size):
+        st.caption("Download the files one by one instead.")
+        return
+    cache = get_result_cache()
+
+    def build() -> bytes:
+        return store_bundle(cache, artifacts, file_name).read_bytes()
+
+    st.download_button(label, build, file_name=file_name, mime=ZIP_MIME, on_click="ignore", **kwargs)
+
+
+def process_batch_job(
+    ctx: JobContext,
+    tool: str,
+    process: Callable[[bytes, str], Tuple[Optional[bytes], Dict[str, Any]]],
+    describe: Callable[[Dict[str, Any]], Tuple[bool, str]],
+    uploads: List[Tuple[str, bytes]],
+    output_suffix: str,
+    workers: int,
+    result_cache: DiskCache,
+) -> Dict[str, Any]:
+    """
+    Run ``process(data, ext)`` over several uploads on a process pool,
+    emitting one record per file as it finishes. Results share the
+    single-file cache keys, so files processed before are not redone.
+    ``describe`` turns a result's metadata into ``(has output, status text)``.
+    """
+    total = len(uploads)
+    finished = 0
+
+    def report(name: str, ext: str, path: Optional[Path], metadata: Dict[str, Any]) -> None:
+        nonlocal finished
+        ok, detail = describe(metadata)
+        artifact = None
+        if ok and path is not None:
+            artifact = Artifact(f"{Path(name).stem}{output_suffix}{ext}", path, OUTPUT_MIME[ext])
+        ctx.emit({"name": name, "ok": ok, "detail": detail, "artifact": artifact})
+        finished += 1
+        ctx.progress(finished / total, f"Processed {finished}/{total}: {name}")
+
+    ctx.progress(0.0, f"Processing {total} files...")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for name, data in uploads:
+            ext = Path(name).suffix.lower()
+            key = make_key(data, tool, {"ext": ext})
+            entry = result_cache.get(key)
+            if entry is not None:
+                report(name, ext, entry.path if entry.metadata.get("has_output") else None, entry.metadata)
+            else:
+                futures[pool.submit(process, data, ext)] = (name, ext, key)
+
+        for future in as_completed(futures):
+            name, ext, key = futures[future]
+            try:
+                data, metadata = future.result()
+            except Exception as exc:
+                report(name, ext, None, {"success": False, "message": str(exc)})
+            else:
+                path = None
+                if metadata.get("success", True):
+                    entry = result_cache.put(key, data or b"", dict(metadata, has_output=data is not None))
+                    path = entry.path if data is not None else None
+                report(name, ext, path, metadata)
+            if ctx.cancelled:
+                for pending in futures:
+                    pending.cancel()
+                break
+    return {"zip_name": f"gammaverse{output_suffix}.zip"}
+
+
+def render_batch(
+    tool: str,
+    uploaded_files,
+    job_key: str,
+    button_label: str,
+    process_name: str,
+    output_suffix: str,
+    describe: Callable[[Dict[str, Any]], Tuple[bool, str]],
+) -> None:
+    """Process several uploads in the background and offer one ZIP of the results."""
+    st.write(f"**{len(uploaded_files)} files** · {sum(f.size for f in uploaded_files) / 1024:.1f} KB in total")
+    st.markdown("---")
 
-    total_removed = 0
-    for layout_name in layout_names:
-        rel_name = f"ppt/slideLayouts/_rels/{Path(layout_name).name}.rels"
-        layout_bytes = contents[layout_name]
-        rel_bytes = contents.get(rel_name)
+    c1, c2 = st.columns([3, 1])
+    with c1:
+        workers = st.number_input(
+            "Files in Parallel",
+            min_value=1,
+            max_value=os.cpu_count() or 1,
+            value=min(DEFAULT_BATCH_WORKERS, os.cpu_count() or 1),
+            help="Each file is processed in its own worker process.",
+            key=f"{job_key}_workers",
+        )
+    with c2:
+        st.write("") # Spacer
+        st.write("") # Spacer
+        process_btn = st.button(button_label, type="primary", use_container_width=True, key=f"{job_key}_start")
 
-        new_layout, new_rels, changed = pptx_cleaner.strip_gamma_from_layout(
-            layout_bytes, rel_bytes
+    if process_btn:
+        st.session_state[job_key] = get_job_manager().submit(
+            tool,
+            process_batch_job,
+            tool,
+            getattr(load_tool_module("gammaverse"), process_name),
+            describe,
+            [(f.name, f.getvalue()) for f in uploaded_files],
+            output_suffix,
+            int(workers),
+            get_result_cache(),
         )
 
-        if changed:
-            contents[layout_name] = new_layout
-            if new_rels is not None:
-                contents[rel_name] = new_rels
-            elif rel_name in contents:
-                del contents[rel_name]
-                del infos[rel_name]
-            total_removed += 1
+    render_job(job_key, render_batch_results)
+
 
-    if total_removed == 0:
-        return 0
+def render_batch_results(job: Job) -> None:
+    for item in job.items:
+        icon = "✅" if item["ok"] else "⚠️"
+        st.write(f"{icon} **{item['name']}**: {item['detail']}")
 
-    pptx_cleaner.write_archive(dest, infos, contents)
-    return total_removed
+    if not job.done:
+        return
+    if job.status == FAILED:
+        st.error(f"❌ Batch failed: {job.error}")
+        return
+    if job.status == CANCELLED:
+        st.warning("Batch cancelled; only the files listed above were processed.")
+
+    outputs = [item["artifact"] for item in job.items if item["artifact"] is not None]
+    if outputs:
+        st.success(f"✅ {len(outputs)} of {len(job.items)} file(s) processed.")
+        download_bundle(
+            f"⬇️ Download {len(outputs)} file(s) as ZIP",
+            outputs,
+            file_name=job.result["zip_name"] if job.result else "gammaverse.zip",
+            use_container_width=True,
+            key=f"{job.id}_zip",
+        )
+    else:
+        st.warning("⚠️ None of the files produced an output.")
 
 
-def process_pdf(src: Path, dest: Path) -> int:
-    shutil.copy(src, dest)
-    return pdf_cleaner.process_pdf(dest)
+def describe_watermark_result(result: Dict[str, Any]) -> Tuple[bool, str]:
+    if "message" in result:
+        return False, f"failed: {result['message']}"
+    removed = result.get("removed", 0)
+    if removed == 0:
+        return False, "no Gamma watermark detected; file untouched"
+    return True, f"removed {removed} watermark element(s)"
+
+
+def describe_nuke_result(result: Dict[str, Any]) -> Tuple[bool, str]:
+    if "message" in result:
+        return False, f"failed: {result['message']}"
+    if not result.get("success"):
+        return False, "failed to remove metadata"
+    return True, "metadata nuked"
 
 
 def load_css() -> None:
@@ -130,14 +422,27 @@ def render_watermark_tool() -> None:
     col1, col2 = st.columns([2, 1])
     
     with col1:
-        uploaded_file = st.file_uploader(
-            "Choose a file", type=["pptx", "pdf"], accept_multiple_files=False
+        uploaded_files = st.file_uploader(
+            "Choose one or more files", type=["pptx", "pdf"], accept_multiple_files=True
         )
 
-    if not uploaded_file:
-        st.info("👆 Upload a file to get started.")
+    if not uploaded_files:
+        st.info("👆 Upload one or more files to get started.")
         return
 
+    if len(uploaded_files) > 1:
+        render_batch(
+            TOOL_WATERMARK,
+            uploaded_files,
+            "watermark_batch_job",
+            "✨ Remove Watermarks",
+            "clean_buffer",
+            "-clean",
+            describe_watermark_result,
+        )
+        return
+    uploaded_file = uploaded_files[0]
+
     with col2:
         st.write("### File Details")
         ext = Path(uploaded_file.name).suffix.lower()
@@ -157,6 +462,16 @@ def render_watermark_tool() -> None:
         st.write("") # Spacer
         process_btn = st.button("✨ Remove Watermark", type="primary", use_container_width=True)
 
+    workers = 1
+    if ext == ".pdf":
+        workers = st.number_input(
+            "Worker Processes",
+            min_value=1,
+            max_value=os.cpu_count() or 1,
+            value=1,
+            help="Scrub pages in parallel. Useful for exports with hundreds of pages.",
+        )
+
     if not output_name.strip():
         st.warning("Please enter a valid file name.")
         return
@@ -165,29 +480,26 @@ def render_watermark_tool() -> None:
 
     if process_btn:
         with st.spinner("Processing file..."):
-            with tempfile.NamedTemporaryFile(delete=False, suffix=ext) as tmp:
-                tmp.write(uploaded_file.getbuffer())
-                tmp_path = Path(tmp.name)
-
             output_path = Path(output_name)
-            if not output_path.is_absolute():
-                output_path = BASE_DIR / output_path
 
-            try:
+            def process() -> Tuple[Optional[bytes], Dict[str, Any]]:
                 if ext == ".pptx":
-                    removed = process_pptx(tmp_path, output_path)
+                    data, removed = process_pptx(uploaded_file)
                 else:
-                    removed = process_pdf(tmp_path, output_path)
+                    data, removed = process_pdf(uploaded_file, workers=int(workers))
+                return data, {"removed": removed}
+
+            try:
+                output, result = run_cached(TOOL_WATERMARK, uploaded_file, {"ext": ext}, process)
+                removed = result["removed"]
 
                 if removed == 0:
                     status_placeholder.warning("⚠️ No Gamma watermark detected; file untouched.")
                 else:
                     status_placeholder.success(f"✅ Successfully removed {removed} watermark element(s)!")
-                    with open(output_path, "rb") as fh:
-                        data = fh.read()
-                    st.download_button(
+                    download_file(
                         "⬇️ Download Cleaned File",
-                        data,
+                        output,
                         file_name=output_path.name,
                         mime="application/vnd.openxmlformats-officedocument.presentationml.presentation"
                         if ext == ".pptx"
@@ -196,8 +508,6 @@ def render_watermark_tool() -> None:
                     )
             except Exception as exc:
                 status_placeholder.error(f"❌ Failed to process file: {exc}")
-            finally:
-                tmp_path.unlink(missing_ok=True)
 
 
 def render_iimjobs_tool() -> None:
@@ -221,7 +531,15 @@ def render_iimjobs_tool() -> None:
         with col2:
             password = st.text_input("Password", type="password", placeholder="••••••••")
         
-        st.caption("Your credentials are used only for this session and are not stored.")
+        remember_session = st.checkbox(
+            "Reuse saved login",
+            value=True,
+            help="Skip the browser login while a previous session for these credentials is still valid.",
+        )
+        st.caption(
+            "Your password is never stored. With saved logins on, the session cookies are kept "
+            "on this server, filed under a hash of your credentials."
+        )
 
     st.markdown("---")
 
@@ -229,7 +547,11 @@ def render_iimjobs_tool() -> None:
         st.subheader("⚙️ Configuration")
         c1, c2 = st.columns([3, 1])
         with c1:
-            output_name = st.text_input("Output Filename", value=IIMJOBS_DEFAULT_OUTPUT)
+            output_name = st.text_input(
+                "Output Filename",
+                value=IIMJOBS_DEFAULT_OUTPUT,
+                help="Use a .parquet or .ndjson.gz name for columnar or compressed output.",
+            )
         with c2:
             st.write("") # Spacer
             st.write("") # Spacer
@@ -244,31 +566,70 @@ def render_iimjobs_tool() -> None:
             status_placeholder.error("⚠️ Email and password are required.")
             return
 
-        with st.spinner("🔄 Connecting to iimjobs... (this may take a moment)"):
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".csv") as tmp:
-                tmp_path = Path(tmp.name)
+        st.session_state["iimjobs_job"] = get_job_manager().submit(
+            "iimjobs",
+            export_iimjobs_job,
+            email,
+            password,
+            output_name or IIMJOBS_DEFAULT_OUTPUT,
+            headless,
+            remember_session,
+            get_browser_pool(headless),
+            get_result_cache(),
+        )
 
-            try:
-                path, count = iimjobs_exporter.export_applied_jobs(
-                    email=email,
-                    password=password,
-                    output_path=tmp_path,
-                    headless=headless,
-                )
-                status_placeholder.success(f"✅ Successfully exported {count} jobs!")
-                with open(path, "rb") as fh:
-                    data = fh.read()
-                st.download_button(
-                    "⬇️ Download CSV",
-                    data,
-                    file_name=output_name or IIMJOBS_DEFAULT_OUTPUT,
-                    mime="text/csv",
-                    use_container_width=True
-                )
-            except Exception as exc:
-                status_placeholder.error(f"❌ Failed to export: {exc}")
-            finally:
-                tmp_path.unlink(missing_ok=True)
+    render_job("iimjobs_job", render_iimjobs_result)
+
+
+def export_iimjobs_job(
+    ctx: JobContext,
+    email: str,
+    password: str,
+    output_name: str,
+    headless: bool,
+    remember_session: bool,
+    browser_pool: "BrowserPool",
+    result_cache: DiskCache,
+) -> Dict[str, Any]:
+    iimjobs_exporter = load_tool_module("export_iimjobs_applied")
+    output_format = iimjobs_exporter.output_format(output_name)
+    suffix, mime = IIMJOBS_OUTPUT_TYPES[output_format]
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+        tmp_path = Path(tmp.name)
+
+    ctx.progress(None, "🔄 Connecting to iimjobs... (this may take a moment)")
+    try:
+        path, count = iimjobs_exporter.export_applied_jobs(
+            email=email,
+            password=password,
+            output_path=tmp_path,
+            headless=headless,
+            use_session_cache=remember_session,
+            browser_pool=browser_pool,
+            progress=lambda fetched: ctx.progress(None, f"Fetched {fetched} applications..."),
+        )
+        artifact = store_artifact(result_cache, Path(path), output_name, mime)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    return {"artifact": artifact, "count": count, "format": output_format}
+
+
+def render_iimjobs_result(job: Job) -> None:
+    if not job.done:
+        return
+    if job.status == FAILED:
+        st.error(f"❌ Failed to export: {job.error}")
+        return
+    if job.status == CANCELLED or job.result is None:
+        st.warning("Export cancelled.")
+        return
+    result = job.result
+    st.success(f"✅ Successfully exported {result['count']} jobs!")
+    download_artifact(
+        f"⬇️ Download {result['format'].upper()}",
+        result["artifact"],
+        use_container_width=True
+    )
 
 
 
@@ -288,14 +649,27 @@ def render_metadata_nuke_tool() -> None:
     col1, col2 = st.columns([2, 1])
     
     with col1:
-        uploaded_file = st.file_uploader(
-            "Choose a file to scrub", type=["pptx", "pdf"], accept_multiple_files=False, key="nuke_uploader"
+        uploaded_files = st.file_uploader(
+            "Choose files to scrub", type=["pptx", "pdf"], accept_multiple_files=True, key="nuke_uploader"
         )
 
-    if not uploaded_file:
-        st.info("👆 Upload a file to get started.")
+    if not uploaded_files:
+        st.info("👆 Upload one or more files to get started.")
         return
 
+    if len(uploaded_files) > 1:
+        render_batch(
+            TOOL_METADATA,
+            uploaded_files,
+            "nuke_batch_job",
+            "☢️ Nuke Metadata",
+            "nuke_buffer",
+            "-nuked",
+            describe_nuke_result,
+        )
+        return
+    uploaded_file = uploaded_files[0]
+
     with col2:
         st.write("### File Details")
         ext = Path(uploaded_file.name).suffix.lower()
@@ -323,27 +697,24 @@ def render_metadata_nuke_tool() -> None:
 
     if nuke_btn:
         with st.spinner("Scrubbing metadata..."):
-            with tempfile.NamedTemporaryFile(delete=False, suffix=ext) as tmp:
-                tmp.write(uploaded_file.getbuffer())
-                tmp_path = Path(tmp.name)
-
             output_path = Path(output_name)
-            if not output_path.is_absolute():
-                output_path = BASE_DIR / output_path
 
-            try:
+            def process() -> Tuple[Optional[bytes], Dict[str, Any]]:
+                metadata_nuke = load_tool_module("metadata_nuke")
                 if ext == ".pptx":
-                    success = metadata_nuke.nuke_pptx_metadata(tmp_path, output_path)
+                    data = metadata_nuke.nuke_pptx_metadata_buffer(uploaded_file)
                 else:
-                    success = metadata_nuke.nuke_pdf_metadata(tmp_path, output_path)
+                    data = metadata_nuke.nuke_pdf_metadata_buffer(uploaded_file)
+                return data, {"success": data is not None}
 
-                if success:
+            try:
+                output, result = run_cached(TOOL_METADATA, uploaded_file, {"ext": ext}, process)
+
+                if result["success"]:
                     status_placeholder.success("✅ Metadata successfully nuked!")
-                    with open(output_path, "rb") as fh:
-                        data = fh.read()
-                    st.download_button(
+                    download_file(
                         "⬇️ Download Clean File",
-                        data,
+                        output,
                         file_name=output_path.name,
                         mime="application/vnd.openxmlformats-officedocument.presentationml.presentation"
                         if ext == ".pptx"
@@ -355,8 +726,6 @@ def render_metadata_nuke_tool() -> None:
                     status_placeholder.error("❌ Failed to remove metadata.")
             except Exception as exc:
                 status_placeholder.error(f"❌ Error: {exc}")
-            finally:
-                tmp_path.unlink(missing_ok=True)
 
 
 def render_unlock_pdf_tool() -> None:
@@ -412,35 +781,151 @@ def render_unlock_pdf_tool() -> None:
             return
 
         with st.spinner("Unlocking PDF..."):
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-                tmp.write(uploaded_file.getbuffer())
-                tmp_path = Path(tmp.name)
-
             output_path = Path(output_name)
-            if not output_path.is_absolute():
-                output_path = BASE_DIR / output_path
+
+            def process() -> Tuple[Optional[bytes], Dict[str, Any]]:
+                unlock_pdf = load_tool_module("unlock_pdf")
+                success, message, data = unlock_pdf.unlock_pdf_buffer(uploaded_file, password)
+                return data, {"success": success, "message": message}
 
             try:
-                success, message = unlock_pdf.unlock_pdf(tmp_path, output_path, password)
+                # Only a per-process HMAC of the password reaches the key, so the
+                # cache file names cannot be used to guess it.
+                output, result = run_cached(
+                    TOOL_UNLOCK_PDF, uploaded_file, {"password": secret_token(password)}, process
+                )
 
-                if success:
+                if result["success"]:
                     status_placeholder.success("✅ PDF successfully unlocked!")
-                    with open(output_path, "rb") as fh:
-                        data = fh.read()
-                    st.download_button(
+                    download_file(
                         "⬇️ Download Unlocked PDF",
-                        data,
+                        output,
                         file_name=output_path.name,
                         mime="application/pdf",
                         use_container_width=True,
                         key="unlock_download"
                     )
                 else:
-                    status_placeholder.error(f"❌ {message}")
+                    status_placeholder.error(f"❌ {result['message']}")
+            except Exception as exc:
+                status_placeholder.error(f"❌ Error: {exc}")
+
+
+def render_sanitize_tool() -> None:
+    st.markdown("<h1>🛡️ Sanitize</h1>", unsafe_allow_html=True)
+    st.markdown(
+        """
+        <div style='background-color: white; padding: 1.5rem; border-radius: 10px; box-shadow: 0 2px 4px rgba(0,0,0,0.05); margin-bottom: 2rem;'>
+            <p style='margin: 0; color: #666; font-size: 1.1rem;'>
+                Unlock, remove the Gamma watermark and nuke metadata in a single pass.
+            </p>
+        </div>
+        """,
+        unsafe_allow_html=True,
+    )
+
+    col1, col2 = st.columns([2, 1])
+
+    with col1:
+        uploaded_file = st.file_uploader(
+            "Choose a file to sanitize", type=["pptx", "pdf"], accept_multiple_files=False, key="sanitize_uploader"
+        )
+
+    if not uploaded_file:
+        st.info("👆 Upload a file to get started.")
+        return
+
+    with col2:
+        st.write("### File Details")
+        ext = Path(uploaded_file.name).suffix.lower()
+        st.write(f"**Type:** {ext.upper()}")
+        st.write(f"**Size:** {uploaded_file.size / 1024:.1f} KB")
+
+    st.markdown("---")
+
+    sanitize = load_tool_module("sanitize")
+    stages = st.multiselect(
+        "Stages",
+        options=list(sanitize.STAGES),
+        default=list(sanitize.STAGES),
+        format_func=SANITIZE_STAGE_LABELS.get,
+        key="sanitize_stages",
+    )
+
+    password = ""
+    if ext == ".pdf" and sanitize.STAGE_UNLOCK in stages:
+        password = st.text_input(
+            "PDF Password", type="password", key="sanitize_password",
+            help="Leave empty if the PDF is not password protected.",
+        )
+
+    default_output = f"{Path(uploaded_file.name).stem}-sanitized{ext}"
+
+    c1, c2 = st.columns([3, 1])
+    with c1:
+        output_name = st.text_input("Output Filename", value=default_output, key="sanitize_output_name")
+
+    with c2:
+        st.write("") # Spacer
+        st.write("") # Spacer
+        sanitize_btn = st.button("🛡️ Sanitize", type="primary", use_container_width=True)
+
+    if not output_name.strip():
+        st.warning("Please enter a valid file name.")
+        return
+
+    status_placeholder = st.empty()
+
+    if sanitize_btn:
+        if not stages:
+            status_placeholder.error("⚠️ Select at least one stage.")
+            return
+
+        with st.spinner("Sanitizing file..."):
+            output_path = Path(output_name)
+
+            def process() -> Tuple[Optional[bytes], Dict[str, Any]]:
+                try:
+                    data, report = sanitize.sanitize_buffer(
+                        uploaded_file, ext, stages, password=password
+                    )
+                except sanitize.SanitizeError as exc:
+                    return None, {"success": False, "message": str(exc)}
+                return data, dict(report, success=True)
+
+            try:
+                # Only a per-process HMAC of the password reaches the key, so the
+                # cache file names cannot be used to guess it.
+                output, result = run_cached(
+                    TOOL_SANITIZE,
+                    uploaded_file,
+                    {"ext": ext, "stages": sorted(stages), "password": secret_token(password)},
+                    process,
+                )
+
+                if result["success"]:
+                    done = []
+                    if result.get("unlocked"):
+                        done.append("unlocked")
+                    if sanitize.STAGE_STRIP_WATERMARK in stages:
+                        done.append(f"removed {result.get('watermark_removed', 0)} watermark element(s)")
+                    if result.get("metadata_nuked"):
+                        done.append("nuked metadata")
+                    status_placeholder.success(f"✅ Sanitized: {', '.join(done) or 'copied'}.")
+                    download_file(
+                        "⬇️ Download Sanitized File",
+                        output,
+                        file_name=output_path.name,
+                        mime="application/vnd.openxmlformats-officedocument.presentationml.presentation"
+                        if ext == ".pptx"
+                        else "application/pdf",
+                        use_container_width=True,
+                        key="sanitize_download"
+                    )
+                else:
+                    status_placeholder.error(f"❌ {result['message']}")
             except Exception as exc:
                 status_placeholder.error(f"❌ Error: {exc}")
-            finally:
-                tmp_path.unlink(missing_ok=True)
 
 
 def render_sakamoto_tool() -> None:
@@ -456,9 +941,6 @@ def render_sakamoto_tool() -> None:
         unsafe_allow_html=True,
     )
 
-    if 'generated_pdfs' not in st.session_state:
-        st.session_state['generated_pdfs'] = []
-
     urls_input = st.text_area(
         "Chapter URLs (one per line)",
         placeholder="https://sakamotodays.org/comic/sakamoto-days-chapter-121/\nhttps://sakamotodays.org/comic/sakamoto-days-chapter-122/",
@@ -472,45 +954,93 @@ def render_sakamoto_tool() -> None:
         urls = [url.strip() for url in urls_input.split("\n") if url.strip()]
         if not urls:
             st.warning("Please enter at least one URL.")
-            st.session_state['generated_pdfs'] = []
+            st.session_state.pop("sakamoto_job", None)
             return
 
-        st.session_state['generated_pdfs'] = []
-        with tempfile.TemporaryDirectory() as tmpdir:
-            for url in urls:
-                with st.spinner(f"Processing {url}..."):
-                    try:
-                        slug = url.strip('/').split('/')[-1]
-                        output_filename = slug.replace('-', '_').title() + ".pdf"
-                        output_path = Path(tmpdir) / output_filename
-
-                        sakamoto_downloader.download_and_create_pdf(url, str(output_path))
-
-                        if output_path.exists():
-                            with open(output_path, "rb") as f:
-                                pdf_data = f.read()
-                            st.session_state['generated_pdfs'].append({
-                                "name": output_filename,
-                                "data": pdf_data
-                            })
-                        else:
-                            st.error(f"Failed to create PDF for {url}.")
-                    except Exception as e:
-                        st.error(f"An error occurred while processing {url}: {e}")
-
-    if st.session_state['generated_pdfs']:
+        previous = st.session_state.get("sakamoto_job")
+        if previous:
+            get_job_manager().cancel(previous)
+        st.session_state["sakamoto_job"] = get_job_manager().submit(
+            "sakamoto", download_chapters_job, urls, get_http_cache(), get_result_cache()
+        )
+
+    render_job("sakamoto_job", render_chapter_results)
+
+
+def download_chapters_job(
+    ctx: JobContext, urls: List[str], http_cache: "HttpCache", result_cache: DiskCache
+) -> int:
+    """
+    Download chapters, emitting each one as it finishes. Finished PDFs move
+    from CHAPTER_DIR into the result cache, where they expire with it.
+    """
+    sakamoto_downloader = load_tool_module("sakamoto_downloader")
+    CHAPTER_DIR.mkdir(parents=True, exist_ok=True)
+    ctx.progress(0.0, f"Downloading {len(urls)} chapter(s)...")
+    with sakamoto_downloader.Fetcher(cache=http_cache) as fetcher:
+        downloads = sakamoto_downloader.iter_chapter_downloads(urls, str(CHAPTER_DIR), fetcher=fetcher)
+        for done, (index, url, output_path, error) in enumerate(downloads, start=1):
+            artifact = None
+            if output_path:
+                name = Path(output_path).name
+                artifact = store_artifact(result_cache, Path(output_path), name, "application/pdf", move=True)
+            ctx.emit({"index": index, "url": url, "pdf": artifact, "error": str(error) if error else None})
+            ctx.progress(done / len(urls), f"Finished {done}/{len(urls)}: {url}")
+            if ctx.cancelled:
+                # Closing the generator cancels chapters that have not started.
+                break
+    return len(urls)
+
+
+def render_chapter_results(job: Job) -> None:
+    chapters = sorted(job.items, key=lambda item: item["index"])
+    for chapter in chapters:
+        if chapter["error"]:
+            st.error(f"An error occurred while processing {chapter['url']}: {chapter['error']}")
+        elif not chapter["pdf"]:
+            st.error(f"Failed to create PDF for {chapter['url']}. Downloaded pages are kept; run it again to resume.")
+        elif not job.done:
+            st.write(f"✅ {chapter['pdf'].name}")
+
+    if not job.done:
+        return
+    if job.status == FAILED:
+        st.error(f"❌ Download failed: {job.error}")
+    elif job.status == CANCELLED:
+        st.warning("Download cancelled. Finished chapters are listed below; run it again to resume the rest.")
+
+    pdfs = [chapter["pdf"] for chapter in chapters if chapter["pdf"] and chapter["pdf"].exists()]
+    http_stats = get_http_cache().stats()
+    st.caption(
+        f"Download cache: {http_stats['downloaded']} transferred · "
+        f"{http_stats['revalidated']} unchanged since last fetch · "
+        f"{http_stats['bytes'] / (1024 * 1024):.1f} MB on disk"
+    )
+    if pdfs:
         st.markdown("---")
-        st.success(f"✅ Processing complete! {len(st.session_state['generated_pdfs'])} PDF(s) are ready for download.")
+        st.success(f"✅ Processing complete! {len(pdfs)} PDF(s) are ready for download.")
         st.subheader("Download Your Files")
 
-        for pdf_file in st.session_state['generated_pdfs']:
-            st.download_button(
-                label=f"⬇️ Download {pdf_file['name']}",
-                data=pdf_file['data'],
-                file_name=pdf_file['name'],
-                mime="application/pdf",
-                key=f"download_{pdf_file['name']}"
+        if len(pdfs) > 1:
+            download_bundle(
+                f"🗜️ Download all {len(pdfs)} as ZIP",
+                pdfs,
+                file_name="sakamoto_chapters.zip",
+                key="download_all_chapters",
             )
+        for pdf in pdfs:
+            download_artifact(f"⬇️ Download {pdf.name}", pdf, key=f"download_{pdf.name}")
+
+
+# Sidebar order. Each page imports its tool module only when it needs it.
+TOOLS: Dict[str, Callable[[], None]] = {
+    TOOL_WATERMARK: render_watermark_tool,
+    TOOL_SANITIZE: render_sanitize_tool,
+    TOOL_IIMJOBS: render_iimjobs_tool,
+    TOOL_METADATA: render_metadata_nuke_tool,
+    TOOL_UNLOCK_PDF: render_unlock_pdf_tool,
+    TOOL_SAKAMOTO: render_sakamoto_tool,
+}
 
 
 def main() -> None:
@@ -530,12 +1060,17 @@ def main() -> None:
         # Custom styling for radio button to look more like a menu
         tool = st.radio(
             "Select a tool:",
-            (TOOL_WATERMARK, TOOL_IIMJOBS, TOOL_METADATA, TOOL_UNLOCK_PDF, TOOL_SAKAMOTO),
+            tuple(TOOLS),
             index=0,
             label_visibility="collapsed"
         )
         
         st.markdown("---")
+        cache_stats = get_result_cache().stats()
+        st.caption(
+            f"Result cache: {cache_stats['hits']} hits · {cache_stats['misses']} misses · "
+            f"{cache_stats['entries']} files ({cache_stats['bytes'] / (1024 * 1024):.1f} MB)"
+        )
         st.markdown(
             """
             <div style='font-size: 0.8rem; color: #666;'>
@@ -546,17 +1081,7 @@ def main() -> None:
             unsafe_allow_html=True
         )
 
-    if tool == TOOL_WATERMARK:
-        render_watermark_tool()
-    elif tool == TOOL_IIMJOBS:
-        render_iimjobs_tool()
-    elif tool == TOOL_METADATA:
-        render_metadata_nuke_tool()
-    elif tool == TOOL_UNLOCK_PDF:
-        render_unlock_pdf_tool()
-    elif tool == TOOL_SAKAMOTO:
-        render_sakamoto_tool()
-
+    TOOLS[tool]()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,91 @@
+"""BrowserPool reuse and retirement, with a stand-in for the WebDriver."""
+
+import pytest
+
+from browser_pool import BrowserPool
+
+ORIGINS = ("https://www.iimjobs.com", "https://gladiator.iimjobs.com")
+
+
+class FakeSwitchTo:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def window(self, handle):
+        self.driver.current = handle
+
+
+class FakeDriver:
+    """Records the CDP commands a reset sends; ``fail_on`` makes one raise."""
+
+    def __init__(self, fail_on=None):
+        self.window_handles = ["main", "popup"]
+        self.current = "main"
+        self.switch_to = FakeSwitchTo(self)
+        self.commands = []
+        self.fail_on = fail_on
+        self.quit_called = False
+
+    def get(self, url):
+        pass
+
+    def close(self):
+        self.window_handles.remove(self.current)
+
+    def execute_cdp_cmd(self, command, params):
+        if command == self.fail_on:
+            raise RuntimeError(f"{command} rejected")
+        self.commands.append((command, params))
+
+    def quit(self):
+        self.quit_called = True
+
+
+@pytest.fixture
+def make_pool(tmp_path):
+    pools = []
+
+    def make(fail_on=None):
+        drivers = []
+
+        def factory(profile_dir):
+            drivers.append(FakeDriver(fail_on))
+            return drivers[-1]
+
+        pool = BrowserPool(factory, max_size=1, idle_timeout=0, origins=ORIGINS)
+        pools.append(pool)
+        return pool, drivers
+
+    yield make
+    for pool in pools:
+        pool.close()
+
+
+def test_a_released_browser_is_reused(make_pool):
+    pool, drivers = make_pool()
+
+    with pool.lease() as first:
+        pass
+    with pool.lease() as second:
+        pass
+
+    assert second is first
+    assert len(drivers) == 1
+    assert first.window_handles == ["main"]
+    cleared = [params["origin"] for command, params in first.commands if command == "Storage.clearDataForOrigin"]
+    assert cleared == list(ORIGINS) * 2
+    assert pool.stats() == {"size": 1, "idle": 1, "in_use": 0, "max_size": 1}
+
+
+def test_a_browser_that_cannot_be_reset_is_retired(make_pool):
+    pool, drivers = make_pool(fail_on="Storage.clearDataForOrigin")
+
+    with pool.lease() as first:
+        pass
+
+    assert first.quit_called
+    assert pool.stats()["size"] == 0
+
+    with pool.lease() as second:
+        assert second is not first
+    assert len(drivers) == 2
@@ -0,0 +1,232 @@
+"""The applied-jobs pager against a local stand-in for the iimjobs API."""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+import export_iimjobs_applied as iimjobs
+
+PAGE_SIZE = iimjobs.PAGE_SIZE
+
+
+class MockApi(ThreadingHTTPServer):
+    """
+    Serves ``total`` applications, newest (highest ID) first, PAGE_SIZE per
+    page. ``throttle`` maps a page to how many 429s it answers before
+    succeeding, each with ``Retry-After: retry_after``.
+    """
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), ApiHandler)
+        self.base = f"http://127.0.0.1:{self.server_address[1]}"
+        self.total = 0
+        self.statuses = {}
+        self.delay = lambda page: 0.0
+        self.throttle = {}
+        self.retry_after = "1"
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def jobs(self, page):
+        ids = range(self.total - page * PAGE_SIZE, max(self.total - (page + 1) * PAGE_SIZE, 0), -1)
+        return [
+            {"applicationId": application_id, "app_status": self.statuses.get(application_id, 0)}
+            for application_id in ids
+        ]
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        api = self.server
+        page = int(parse_qs(urlsplit(self.path).query)["page"][0])
+        with api.lock:
+            api.requests.append((page, time.monotonic()))
+            throttled = api.throttle.get(page, 0) > 0
+            if throttled:
+                api.throttle[page] -= 1
+        if throttled:
+            self.send_response(429)
+            self.send_header("Retry-After", api.retry_after)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        time.sleep(api.delay(page))
+        body = json.dumps({"data": {"jobs": api.jobs(page)}}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def api(monkeypatch):
+    server = MockApi()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(iimjobs, "APPLIED_JOBS_API", server.base + "/job/applied-jobs?page={page}&status=")
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def session():
+    with iimjobs.new_session("test-agent") as session:
+        yield session
+
+
+def requested_pages(api):
+    return sorted({page for page, _ in api.requests})
+
+
+def test_pages_come_back_in_order_when_later_pages_answer_first(api, session):
+    api.total = 5 * PAGE_SIZE + 7
+    # Earlier pages are the slowest to answer.
+    api.delay = lambda page: max(0.0, 0.2 - page * 0.04)
+
+    jobs = iimjobs.fetch_applied_jobs(session, workers=4)
+
+    assert [job["applicationId"] for job in jobs] == list(range(api.total, 0, -1))
+
+
+def test_paging_stops_at_a_short_last_page(api, session):
+    api.total = 2 * PAGE_SIZE + 20
+
+    pages = list(iimjobs.iter_applied_job_pages(session, workers=3))
+
+    assert [len(page) for page in pages] == [PAGE_SIZE, PAGE_SIZE, 20]
+    # Nothing is requested beyond the probes already in flight at page 2.
+    assert max(requested_pages(api)) <= 2 + 3 - 1
+
+
+def test_paging_stops_at_an_empty_page(api, session):
+    api.total = 2 * PAGE_SIZE
+
+    pages = list(iimjobs.iter_applied_job_pages(session, workers=2))
+
+    assert [len(page) for page in pages] == [PAGE_SIZE, PAGE_SIZE]
+    assert max(requested_pages(api)) <= 3
+
+
+def test_no_applications(api, session):
+    assert iimjobs.fetch_applied_jobs(session, workers=4) == []
+
+
+def test_rate_limited_page_waits_for_retry_after(api, session):
+    api.total = 3 * PAGE_SIZE + 1
+    api.throttle = {1: 1}
+    api.retry_after = "1"
+
+    jobs = iimjobs.fetch_applied_jobs(session, workers=1)
+
+    assert [job["applicationId"] for job in jobs] == list(range(api.total, 0, -1))
+    page_1 = [at for page, at in api.requests if page == 1]
+    assert len(page_1) == 2
+    assert page_1[1] - page_1[0] >= 1.0
+
+
+def test_rate_limit_pauses_every_worker():
+    limiter = iimjobs.RateLimiter()
+    limiter.pause(0.3)
+    started = time.monotonic()
+    threads = [threading.Thread(target=limiter.wait) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert time.monotonic() - started >= 0.3
+
+
+def test_rate_limit_gives_up_after_the_retry_budget(api, session, monkeypatch):
+    monkeypatch.setattr(iimjobs, "RATE_LIMIT_RETRIES", 2)
+    api.total = PAGE_SIZE
+    api.throttle = {0: 10}
+    api.retry_after = "0"
+
+    with pytest.raises(iimjobs.requests.HTTPError):
+        iimjobs.fetch_applied_jobs_page(session, 0)
+    assert len(api.requests) == 3
+
+
+@pytest.fixture
+def export(api, session, monkeypatch, tmp_path):
+    """Run export_applied_jobs against the mock API, skipping the login."""
+    monkeypatch.setattr(iimjobs, "open_session", lambda *args, **kwargs: session)
+    output_path = tmp_path / "jobs.csv"
+
+    def run(**kwargs):
+        return iimjobs.export_applied_jobs("me@example.com", "secret", output_path, **kwargs)[1]
+
+    return output_path, run
+
+
+def test_full_export_records_statuses_for_the_next_incremental_run(api, export):
+    output_path, run = export
+    api.total = PAGE_SIZE + 10
+    assert run() == api.total
+
+    # The state file is rewritten even though the CSV already exists.
+    api.statuses = {api.total: 1}
+    assert run() == api.total
+    assert iimjobs.load_known_statuses(output_path)[api.total] == 1
+
+    api.statuses = {api.total: 1, api.total - 1: 2}
+    assert run(incremental=True) == 1
+
+
+def test_settled_pages_bounds_how_far_back_status_changes_are_seen(api, export):
+    output_path, run = export
+    api.total = 4 * PAGE_SIZE
+    run()
+    api.statuses = {3: 1}
+
+    assert run(incremental=True) == 0
+    assert run(incremental=True, settled_pages=0) == 1
+    assert iimjobs.load_known_statuses(output_path)[3] == 1
+
+
+class LoggedInDriver:
+    """Just enough of a WebDriver for build_session."""
+
+    cookies = [
+        # Host-only cookie set by the login page.
+        {"name": "session", "value": "abc", "domain": "www.iimjobs.com", "path": "/", "expiry": 4102444800},
+        {"name": "token", "value": "xyz", "domain": ".iimjobs.com", "path": "/", "secure": True},
+        {"name": "pref", "value": "1", "domain": "www.iimjobs.com", "path": "/applied-jobs"},
+    ]
+
+    def execute_script(self, script):
+        return "test-agent"
+
+    def get_cookies(self):
+        return [dict(cookie) for cookie in self.cookies]
+
+
+def cookies_sent(session, url):
+    return session.prepare_request(iimjobs.requests.Request("GET", url)).headers.get("Cookie")
+
+
+def test_a_cached_session_sends_the_same_cookies_as_a_fresh_login(tmp_path):
+    driver = LoggedInDriver()
+    fresh = iimjobs.build_session(driver)
+    path = tmp_path / "session.json"
+    iimjobs.save_session(path, iimjobs.session_state(fresh, driver.get_cookies()))
+
+    with open(path, "r", encoding="utf-8") as fh:
+        restored = iimjobs.session_from_state(iimjobs.json.load(fh))
+
+    api_url = iimjobs.APPLIED_JOBS_API.format(page=0)
+    assert cookies_sent(fresh, api_url) == "session=abc; token=xyz; pref=1"
+    assert cookies_sent(restored, api_url) == cookies_sent(fresh, api_url)
+    assert cookies_sent(restored, iimjobs.APPLIED_JOBS_URL) == cookies_sent(fresh, iimjobs.APPLIED_JOBS_URL)
+    assert restored.headers["User-Agent"] == fresh.headers["User-Agent"]
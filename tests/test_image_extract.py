@@ -0,0 +1,43 @@
+"""Every extractor must find the same chapter images as the full soup parse."""
+
+from pathlib import Path
+
+import pytest
+
+import image_extract
+from image_extract import CHAPTER_END_TAG, extract_image_urls
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+PAGES = sorted(path.name for path in FIXTURES.glob("chapter-*.html"))
+BASE_URL = "https://sakamotodays.org/comic/sakamoto-days-chapter-97/"
+
+
+def reference(data):
+    return extract_image_urls(data, BASE_URL, "soup")
+
+
+@pytest.mark.parametrize("chunk", [image_extract.FEED_CHUNK, 4096, 97])
+@pytest.mark.parametrize("stop_tag", [None, CHAPTER_END_TAG])
+@pytest.mark.parametrize("name", PAGES)
+def test_stream_matches_soup(monkeypatch, name, stop_tag, chunk):
+    monkeypatch.setattr(image_extract, "FEED_CHUNK", chunk)
+    data = (FIXTURES / name).read_bytes()
+    assert extract_image_urls(data, BASE_URL, "stream", stop_tag=stop_tag) == reference(data)
+
+
+@pytest.mark.parametrize("name", PAGES)
+def test_strainer_matches_soup(name):
+    data = (FIXTURES / name).read_bytes()
+    assert extract_image_urls(data, BASE_URL, "strainer") == reference(data)
+
+
+def test_images_after_the_stop_tag_are_kept():
+    # Chapter 99 embeds a post card, with its own <article>, between pages.
+    data = (FIXTURES / "chapter-99.html").read_bytes()
+    first_end = data.index(b"</article>")
+    assert data.find(b"wp-image", first_end) > 0
+
+    urls = extract_image_urls(data, BASE_URL, "stream", stop_tag=CHAPTER_END_TAG)
+    assert len(urls) == 20
+    assert urls[-1].endswith("/sakamoto-days-99-20.jpg")
+
@@ -0,0 +1,121 @@
+"""Watermark removal on small generated PDFs."""
+
+import io
+
+import pytest
+from pypdf import PdfReader, PdfWriter
+from pypdf.generic import (
+    ArrayObject,
+    DecodedStreamObject,
+    DictionaryObject,
+    NameObject,
+    NumberObject,
+    TextStringObject,
+)
+
+import remove_gamma_logo_pdf
+from remove_gamma_logo_pdf import GAMMA_IMG_HEIGHT, GAMMA_IMG_WIDTH, process_pdf_buffer
+
+PAGES = 6
+
+
+def watermark_image(writer):
+    image = DecodedStreamObject()
+    image.set_data(b"\xff" * (GAMMA_IMG_WIDTH * GAMMA_IMG_HEIGHT * 3))
+    image.update(
+        {
+            NameObject("/Type"): NameObject("/XObject"),
+            NameObject("/Subtype"): NameObject("/Image"),
+            NameObject("/Width"): NumberObject(GAMMA_IMG_WIDTH),
+            NameObject("/Height"): NumberObject(GAMMA_IMG_HEIGHT),
+            NameObject("/BitsPerComponent"): NumberObject(8),
+            NameObject("/ColorSpace"): NameObject("/DeviceRGB"),
+        }
+    )
+    return writer._add_object(image)
+
+
+def link(writer, uri):
+    annot = DictionaryObject(
+        {
+            NameObject("/Type"): NameObject("/Annot"),
+            NameObject("/Subtype"): NameObject("/Link"),
+            NameObject("/Rect"): ArrayObject([NumberObject(n) for n in (0, 0, 10, 10)]),
+            NameObject("/A"): DictionaryObject(
+                {
+                    NameObject("/S"): NameObject("/URI"),
+                    NameObject("/URI"): TextStringObject(uri),
+                }
+            ),
+        }
+    )
+    return writer._add_object(annot)
+
+
+def make_pdf(pages=PAGES, shared=False):
+    """A deck where every page draws the watermark image and links to Gamma."""
+    writer = PdfWriter()
+    shared_image = watermark_image(writer) if shared else None
+    for i in range(pages):
+        page = writer.add_blank_page(612, 792)
+        image = shared_image or watermark_image(writer)
+        page[NameObject("/Resources")] = DictionaryObject(
+            {NameObject("/XObject"): DictionaryObject({NameObject("/Im0"): image})}
+        )
+        content = DecodedStreamObject()
+        content.set_data(
+            f"BT /F1 12 Tf (slide {i}) Tj ET\n"
+            f"q {GAMMA_IMG_WIDTH} 0 0 {GAMMA_IMG_HEIGHT} 20 20 cm /Im0 Do Q\n".encode()
+        )
+        page[NameObject("/Contents")] = writer._add_object(content)
+        page[NameObject("/Annots")] = ArrayObject(
+            [link(writer, "https://gamma.app/?utm_source=made-with-gamma"), link(writer, "https://example.com")]
+        )
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+
+def assert_clean(data, pages=PAGES):
+    reader = PdfReader(io.BytesIO(data))
+    assert len(reader.pages) == pages
+    for page in reader.pages:
+        assert b"/Im0 Do" not in page.get_contents().get_data()
+        uris = [annot.get_object()["/A"]["/URI"] for annot in page["/Annots"]]
+        assert uris == ["https://example.com"]
+        image = page["/Resources"]["/XObject"]["/Im0"].get_object()
+        assert (image["/Width"], image["/Height"]) == (1, 1)
+
+
+@pytest.mark.parametrize("shared", [False, True], ids=["per-page", "shared"])
+def test_parallel_output_matches_serial(shared):
+    data = make_pdf(shared=shared)
+
+    serial, serial_removed = process_pdf_buffer(data, workers=1)
+    parallel, parallel_removed = process_pdf_buffer(data, workers=2)
+
+    assert serial is not None
+    assert parallel == serial
+    assert parallel_removed == serial_removed
+    assert_clean(serial)
+
+
+@pytest.mark.parametrize("shared, images", [(False, PAGES), (True, 1)], ids=["per-page", "shared"])
+def test_each_distinct_image_is_classified_and_counted_once(monkeypatch, shared, images):
+    checked = []
+    is_gamma_image = remove_gamma_logo_pdf.is_gamma_image
+    monkeypatch.setattr(
+        remove_gamma_logo_pdf,
+        "is_gamma_image",
+        lambda image: checked.append(image.indirect_reference.idnum) or is_gamma_image(image),
+    )
+    reader = PdfReader(io.BytesIO(make_pdf(shared=shared)))
+
+    writer, removed = remove_gamma_logo_pdf.remove_watermark(reader)
+
+    assert len(checked) == len(set(checked)) == images
+    # One Gamma link per page plus each distinct image blanked.
+    assert removed == PAGES + images
+    output = io.BytesIO()
+    writer.write(output)
+    assert_clean(output.getvalue())
@@ -0,0 +1,183 @@
+"""Chapter downloads against a local stand-in for the comic site."""
+
+import io
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from PIL import Image
+from pypdf import PdfReader
+
+import sakamoto_downloader
+
+IMAGE_DELAY = 0.05
+
+
+def png(width):
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, 50), (width % 255, 80, 120)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+class ComicSite(ThreadingHTTPServer):
+    """
+    Serves ``routes`` (path -> body). A path listed in ``failures`` answers
+    503 that many times before succeeding. Tracks how many image requests
+    were in flight at once.
+    """
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), SiteHandler)
+        self.base = f"http://127.0.0.1:{self.server_address[1]}"
+        self.routes = {}
+        self.failures = {}
+        self.hits = {}
+        self.delays = {}
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def add_chapter(self, name, widths, delays=None):
+        images = []
+        for page, width in enumerate(widths):
+            path = f"/img/{name}-{page}.png"
+            self.routes[path] = png(width)
+            self.delays[path] = delays[page] if delays else IMAGE_DELAY
+            images.append(f'<img class="aligncenter wp-image-{page}" src="{path}" alt="">')
+        html = "<html><body><img src='/logo.png' class='logo'>" + "".join(images) + "</body></html>"
+        self.routes[f"/comic/{name}/"] = html.encode("utf-8")
+        return f"{self.base}/comic/{name}/"
+
+
+class SiteHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        site = self.server
+        with site.lock:
+            site.hits[self.path] = site.hits.get(self.path, 0) + 1
+            failing = site.failures.get(self.path, 0) >= site.hits[self.path]
+            site.active += 1
+            site.max_active = max(site.max_active, site.active)
+        try:
+            time.sleep(site.delays.get(self.path, 0))
+            body = site.routes.get(self.path)
+            if failing:
+                self.send_response(503)
+                body = b""
+            elif body is None:
+                self.send_response(404)
+                body = b""
+            else:
+                self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with site.lock:
+                site.active -= 1
+
+
+@pytest.fixture
+def site():
+    server = ComicSite()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def page_widths(pdf_path):
+    # ImagePdfWriter lays pages out at 100 dpi.
+    return [round(float(page.mediabox.width) * 100 / 72) for page in PdfReader(str(pdf_path)).pages]
+
+
+def test_pages_keep_their_order_when_they_arrive_out_of_order(site, tmp_path):
+    widths = [100, 110, 120, 130, 140, 150]
+    # Earlier pages are the slowest to arrive.
+    url = site.add_chapter("chapter-1", widths, delays=[0.3, 0.25, 0.2, 0.15, 0.1, 0.0])
+    output = tmp_path / "chapter.pdf"
+
+    with sakamoto_downloader.Fetcher(max_workers=6, per_host=6) as fetcher:
+        assert sakamoto_downloader.download_and_create_pdf(url, str(output), fetcher)
+
+    assert page_widths(output) == widths
+
+
+def test_concurrent_chapters_report_their_own_pages(site, tmp_path):
+    urls = [site.add_chapter(f"chapter-{n}", [100 + n, 200 + n]) for n in range(3)]
+
+    with sakamoto_downloader.Fetcher() as fetcher:
+        results = list(sakamoto_downloader.iter_chapter_downloads(urls, str(tmp_path), fetcher=fetcher))
+
+    assert sorted(index for index, _, _, _ in results) == [0, 1, 2]
+    for index, url, output_path, error in results:
+        assert error is None and url == urls[index]
+        assert page_widths(output_path) == [100 + index, 200 + index]
+
+
+def test_transient_server_errors_are_retried(site, tmp_path):
+    url = site.add_chapter("chapter-1", [100, 110, 120])
+    site.failures["/img/chapter-1-1.png"] = 2
+    output = tmp_path / "chapter.pdf"
+
+    with sakamoto_downloader.Fetcher(backoff=0) as fetcher:
+        assert sakamoto_downloader.download_and_create_pdf(url, str(output), fetcher)
+
+    assert site.hits["/img/chapter-1-1.png"] == 3
+    assert page_widths(output) == [100, 110, 120]
+
+
+def test_requests_to_one_host_respect_the_limit(site, tmp_path):
+    urls = [site.add_chapter(f"chapter-{n}", [100] * 6) for n in range(3)]
+
+    with sakamoto_downloader.Fetcher(max_workers=8, per_host=2) as fetcher:
+        results = list(sakamoto_downloader.iter_chapter_downloads(urls, str(tmp_path), fetcher=fetcher))
+
+    assert all(output_path for _, _, output_path, _ in results)
+    assert site.max_active == 2
+
+
+def test_a_failing_page_keeps_the_chapter_resumable(site, tmp_path):
+    url = site.add_chapter("chapter-1", [100, 110, 120])
+    broken = "/img/chapter-1-1.png"
+    image = site.routes.pop(broken)
+    output = tmp_path / "chapter.pdf"
+
+    with sakamoto_downloader.Fetcher(backoff=0) as fetcher:
+        for run in (1, 2):
+            assert not sakamoto_downloader.download_and_create_pdf(url, str(output), fetcher)
+            # The attempt cap applies per run, never across runs.
+            assert site.hits[broken] == run * sakamoto_downloader.IMAGE_ATTEMPTS
+            assert not output.exists()
+
+        checkpoint = sakamoto_downloader.ChapterCheckpoint(str(output))
+        assert checkpoint.load(url)
+        assert not checkpoint.complete
+        assert checkpoint.missing() == [1]
+
+        site.routes[broken] = image
+        site.hits.clear()
+        assert sakamoto_downloader.download_and_create_pdf(url, str(output), fetcher)
+
+    assert site.hits == {broken: 1}
+    assert page_widths(output) == [100, 110, 120]
+
+
+def test_only_a_recorded_completion_skips_the_chapter(site, tmp_path):
+    url = site.add_chapter("chapter-1", [100, 110])
+    output = tmp_path / "chapter.pdf"
+    output.write_bytes(b"left over from another run")
+
+    with sakamoto_downloader.Fetcher() as fetcher:
+        assert sakamoto_downloader.download_and_create_pdf(url, str(output), fetcher)
+        assert page_widths(output) == [100, 110]
+
+        site.hits.clear()
+        assert sakamoto_downloader.download_and_create_pdf(url, str(output), fetcher)
+        assert site.hits == {}
@@ -0,0 +1,87 @@
+"""xml_backend must produce exactly what ElementTree's public API produces."""
+
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import pytest
+
+import metadata_nuke
+import remove_gamma_logo
+import xml_backend
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+XML_FIXTURES = ["slideLayout1.xml", "slideLayout1.xml.rels", "core.xml", "app.xml"]
+BACKENDS = sorted(xml_backend.FINDERS)
+
+
+def reference(data, encoding="utf-8"):
+    return ET.tostring(ET.fromstring(data), encoding=encoding, xml_declaration=True)
+
+
+@pytest.mark.parametrize("encoding", ["utf-8", "UTF-8"])
+@pytest.mark.parametrize("name", XML_FIXTURES)
+def test_tostring_matches_elementtree(name, encoding):
+    data = (FIXTURES / name).read_bytes()
+    assert xml_backend.tostring(ET.fromstring(data), encoding=encoding) == reference(data, encoding)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("name", XML_FIXTURES)
+def test_every_backend_parses_to_the_same_bytes(name, backend):
+    data = (FIXTURES / name).read_bytes()
+    root, _ = xml_backend.find_with_parents(data, remove_gamma_logo.PIC_TAG, backend)
+    assert xml_backend.tostring(root) == reference(data)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_matches_are_paired_with_their_parents(backend):
+    data = (FIXTURES / "slideLayout1.xml").read_bytes()
+    _, pics = xml_backend.find_with_parents(data, remove_gamma_logo.PIC_TAG, backend)
+    found = {
+        (parent.tag.rsplit("}", 1)[1], pic.find(".//p:cNvPr", remove_gamma_logo.NS).get("name"))
+        for parent, pic in pics
+    }
+    assert found == {("grpSp", "Made with Gamma"), ("spTree", "Logo")}
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_layout_rewrite_removes_only_the_gamma_picture(backend, monkeypatch):
+    monkeypatch.setattr(xml_backend, "BACKEND", backend)
+    layout = (FIXTURES / "slideLayout1.xml").read_bytes()
+    rels = (FIXTURES / "slideLayout1.xml.rels").read_bytes()
+
+    new_layout, new_rels, changed = remove_gamma_logo.strip_gamma_from_layout(layout, rels)
+
+    assert changed
+    assert b"Made with Gamma" not in new_layout and b'name="Logo"' in new_layout
+    assert b"gamma.app" not in new_rels and b"example.com" in new_rels
+    # The removed picture's image relationship goes with it.
+    assert b'Id="rId3"' not in new_rels
+
+
+@pytest.mark.parametrize("name", ["core.xml", "app.xml"])
+def test_docprops_scrub_matches_elementtree(name):
+    data = (FIXTURES / name).read_bytes()
+    tags = metadata_nuke.PPTX_DOCPROPS_TAGS[f"docProps/{name}"]
+
+    root = ET.fromstring(data)
+    for elem in root.iter():
+        local_name = elem.tag.split("}", 1)[-1]
+        if local_name in tags:
+            elem.text = "1970-01-01T00:00:00Z" if local_name in ("created", "modified") else ""
+
+    assert metadata_nuke._scrub_xml_bytes(data, tags) == ET.tostring(
+        root, encoding="UTF-8", xml_declaration=True
+    )
+
+
+def test_docprops_keep_their_namespace_prefixes():
+    data = (FIXTURES / "app.xml").read_bytes()
+    scrubbed = metadata_nuke._scrub_xml_bytes(data, metadata_nuke.PPTX_DOCPROPS_TAGS["docProps/app.xml"])
+    assert scrubbed.startswith(
+        b"<?xml version='1.0' encoding='UTF-8'?>\n<Properties "
+        b'xmlns="http://schemas.openxmlformats.org/officeDocument/2006/extended-properties" '
+        b'xmlns:vt="http://schemas.openxmlformats.org/officeDocument/2006/docPropsVTypes">'
+    )
+    assert b"<vt:lpstr>Theme</vt:lpstr>" in scrubbed
+    assert b"ns0:" not in scrubbed and b"<Company />" in scrubbed
@@ -0,0 +1,97 @@
+"""Raw member copying in zip_stream relies on zipfile internals; pin its behaviour."""
+
+import io
+import zipfile
+
+import pytest
+
+import zip_stream
+
+MEMBERS = [
+    ("[Content_Types].xml", b"<Types/>" * 50, zipfile.ZIP_DEFLATED),
+    ("ppt/media/image1.png", bytes(range(256)) * 40, zipfile.ZIP_STORED),
+    ("ppt/slideLayouts/slideLayout1.xml", b"<p:sldLayout>gamma</p:sldLayout>" * 30, zipfile.ZIP_DEFLATED),
+    ("docProps/core.xml", b"<cp:coreProperties>me</cp:coreProperties>", zipfile.ZIP_DEFLATED),
+    ("ppt/media/image2.jpeg", b"\xff\xd8" + b"jpeg" * 500, zipfile.ZIP_STORED),
+]
+NEW_LAYOUT = b"<p:sldLayout>clean</p:sldLayout>"
+
+
+class Unseekable(io.RawIOBase):
+    """A write-only stream, so zipfile falls back to data descriptors."""
+
+    def __init__(self, sink):
+        self.sink = sink
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        return self.sink.write(data)
+
+
+@pytest.fixture(params=["seekable", "data-descriptors"])
+def deck(request, tmp_path):
+    buffer = io.BytesIO()
+    target = buffer if request.param == "seekable" else Unseekable(buffer)
+    with zipfile.ZipFile(target, "w") as zf:
+        for name, data, compression in MEMBERS:
+            info = zipfile.ZipInfo(name, date_time=(2024, 1, 2, 3, 4, 6))
+            info.compress_type = compression
+            with zf.open(info, "w") as fh:
+                fh.write(data)
+    path = tmp_path / "deck.pptx"
+    path.write_bytes(buffer.getvalue())
+    return path
+
+
+def describe(path):
+    with zipfile.ZipFile(path) as zf:
+        assert zf.testzip() is None
+        return [(info.filename, info.compress_type, zf.read(info)) for info in zf.infolist()]
+
+
+def test_untouched_archive_round_trips(deck, tmp_path):
+    output = tmp_path / "out.pptx"
+    zip_stream.rewrite_zip(deck, output, {})
+    assert describe(output) == describe(deck)
+
+
+def test_replacements_keep_order_and_compression(deck, tmp_path):
+    output = tmp_path / "out.pptx"
+    zip_stream.rewrite_zip(
+        deck,
+        output,
+        {"ppt/slideLayouts/slideLayout1.xml": NEW_LAYOUT, "docProps/core.xml": None},
+    )
+
+    expected = [
+        (name, compression, NEW_LAYOUT if name == "ppt/slideLayouts/slideLayout1.xml" else data)
+        for name, data, compression in MEMBERS
+        if name != "docProps/core.xml"
+    ]
+    assert describe(output) == expected
+    with zipfile.ZipFile(output) as zf:
+        names = zf.namelist()
+    assert len(names) == len(set(names))
+
+
+def test_rewrite_in_place(deck):
+    zip_stream.rewrite_zip(deck, deck, {"ppt/slideLayouts/slideLayout1.xml": NEW_LAYOUT})
+    assert [name for name, _, _ in describe(deck)] == [name for name, _, _ in MEMBERS]
+
+
+def test_write_members_into_a_buffer(deck):
+    output = io.BytesIO()
+    with zipfile.ZipFile(deck) as zin, zipfile.ZipFile(output, "w") as zout:
+        zip_stream.write_members(zin, zout, {"ppt/slideLayouts/slideLayout1.xml": NEW_LAYOUT})
+
+    output.seek(0)
+    with zipfile.ZipFile(output) as zf:
+        assert zf.testzip() is None
+        assert [(info.filename, info.compress_type) for info in zf.infolist()] == [
+            (name, compression) for name, _, compression in MEMBERS
+        ]
+        assert zf.read("ppt/slideLayouts/slideLayout1.xml") == NEW_LAYOUT
+        # Raw-copied members carry no data descriptor any more.
+        assert not any(info.flag_bits & zip_stream.DATA_DESCRIPTOR_FLAG for info in zf.infolist())
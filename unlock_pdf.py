@@ -2,6 +2,15 @@
 
 from pypdf import PdfReader, PdfWriter
 import argparse
+import io
+
+from buffers import as_stream
+
+def _copy_pages(reader):
+    writer = PdfWriter()
+    for page in reader.pages:
+        writer.add_page(page)
+    return writer
 
 def unlock_pdf(input_pdf_path, output_pdf_path, password):
     try:
@@ -9,9 +18,7 @@ def unlock_pdf(input_pdf_path, output_pdf_path, password):
 
         if reader.is_encrypted:
             if reader.decrypt(password):
-                writer = PdfWriter()
-                for page in reader.pages:
-                    writer.add_page(page)
+                writer = _copy_pages(reader)
 
                 with open(output_pdf_path, "wb") as output_file:
                     writer.write(output_file)
@@ -19,9 +26,7 @@ def unlock_pdf(input_pdf_path, output_pdf_path, password):
             else:
                 return False, f"Error: Could not decrypt '{input_pdf_path}'. Incorrect password."
         else:
-            writer = PdfWriter()
-            for page in reader.pages:
-                writer.add_page(page)
+            writer = _copy_pages(reader)
 
             with open(output_pdf_path, "wb") as output_file:
                 writer.write(output_file)
@@ -32,6 +37,29 @@ def unlock_pdf(input_pdf_path, output_pdf_path, password):
     except Exception as e:
         return False, f"An unexpected error occurred: {e}"
 
+def unlock_pdf_buffer(data, password):
+    """
+    In-memory variant of unlock_pdf for bytes, BytesIO or memoryview input.
+    Returns (success, message, unlocked PDF bytes or None).
+    """
+    try:
+        reader = PdfReader(as_stream(data))
+
+        if reader.is_encrypted and not reader.decrypt(password):
+            return False, "Error: Could not decrypt the PDF. Incorrect password.", None
+
+        message = (
+            "Successfully unlocked the PDF."
+            if reader.is_encrypted
+            else "The PDF is not password protected. Returning a copy."
+        )
+        output = io.BytesIO()
+        _copy_pages(reader).write(output)
+        return True, message, output.getvalue()
+
+    except Exception as e:
+        return False, f"An unexpected error occurred: {e}", None
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Unlock a password-protected PDF file.")
     parser.add_argument("input_pdf", help="Path to the encrypted input PDF file.")
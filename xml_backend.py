@@ -0,0 +1,154 @@
+"""
+Parse, search and serialize the XML parts the PPTX cleaners rewrite.
+
+Rewritten parts are always serialized by ElementTree, so the bytes written
+back into a deck do not depend on the backend. ElementTree re-declares
+every namespace on the root element (renaming prefixes it has not been
+told about) and writes empty elements as ``<a />``; lxml keeps the
+original declarations, so its own output would differ. Backends only
+differ in how a part is parsed and searched:
+
+    etree      xml.etree.ElementTree, then one pass over the tree (default)
+    iterparse  ElementTree's pull parser, fed in chunks; matches are
+               collected while the part is parsed. The whole tree is still
+               built, because the rewritten part is serialized from it, so
+               this saves the second pass, not memory
+    lxml       libxml2 parser and compiled XPath, if lxml is installed
+
+``GAMMAVERSE_XML_BACKEND`` selects the backend. etree is the default
+because it measured fastest: iterparse pays for an event per element, and
+ElementTree serializes lxml trees more slowly than its own (see
+benchmarks/bench_layout_rewrite.py).
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Any, Callable, Dict, List, Tuple
+import xml.etree.ElementTree as ET
+
+try:
+    from lxml import etree as lxml_etree
+except ImportError:
+    lxml_etree = None
+
+Element = Any
+Matches = List[Tuple[Element, Element]]
+Finder = Callable[[bytes, str], Tuple[Element, Matches]]
+
+FEED_CHUNK = 64 * 1024
+
+
+def _split_tag(tag: str) -> Tuple[str, str]:
+    uri, _, local = tag[1:].partition("}")
+    return uri, local
+
+
+def find_etree(data: bytes, tag: str) -> Tuple[Element, Matches]:
+    """Parse ``data`` and pair every ``tag`` element with its parent."""
+    root = ET.fromstring(data)
+    return root, [(parent, child) for parent in root.iter() for child in parent if child.tag == tag]
+
+
+def find_iterparse(data: bytes, tag: str) -> Tuple[Element, Matches]:
+    """
+    Like ``find_etree``, pairing matches with their parents while parsing.
+    The full tree is kept: callers serialize the part again afterwards.
+    """
+    parser = ET.XMLPullParser(events=("start", "end"))
+    stack: List[Element] = []
+    matches: Matches = []
+    roots: List[Element] = []
+
+    def consume() -> None:
+        for event, elem in parser.read_events():
+            if event == "start":
+                if not stack:
+                    roots.append(elem)
+                stack.append(elem)
+                continue
+            stack.pop()
+            if elem.tag == tag and stack:
+                matches.append((stack[-1], elem))
+
+    for start in range(0, len(data), FEED_CHUNK):
+        parser.feed(data[start:start + FEED_CHUNK])
+        consume()
+    parser.close()
+    consume()
+    if not roots:
+        raise ET.ParseError("no element found")
+    return roots[0], matches
+
+
+if lxml_etree is not None:
+    # Comments and processing instructions are dropped, as ElementTree's parser does.
+    _LXML_PARSER = lxml_etree.XMLParser(
+        remove_comments=True, remove_pis=True, resolve_entities=False, huge_tree=True
+    )
+    _XPATHS: Dict[str, Any] = {}
+
+    def _xpath(tag: str):
+        query = _XPATHS.get(tag)
+        if query is None:
+            uri, local = _split_tag(tag)
+            query = _XPATHS[tag] = lxml_etree.XPath(f"//t:{local}", namespaces={"t": uri})
+        return query
+
+    def find_lxml(data: bytes, tag: str) -> Tuple[Element, Matches]:
+        root = lxml_etree.fromstring(data, _LXML_PARSER)
+        return root, [(elem.getparent(), elem) for elem in _xpath(tag)(root) if elem.getparent() is not None]
+
+
+FINDERS: Dict[str, Finder] = {"etree": find_etree, "iterparse": find_iterparse}
+if lxml_etree is not None:
+    FINDERS["lxml"] = find_lxml
+DEFAULT_BACKEND = "etree"
+BACKEND = os.getenv("GAMMAVERSE_XML_BACKEND", DEFAULT_BACKEND)
+
+
+def finder_for(backend: str = "") -> Finder:
+    """The finder for ``backend`` (default: BACKEND)."""
+    backend = backend or BACKEND
+    try:
+        return FINDERS[backend]
+    except KeyError:
+        raise ValueError(f"Unknown or unavailable XML backend: {backend}") from None
+
+
+def find_with_parents(data: bytes, tag: str, backend: str = "") -> Tuple[Element, Matches]:
+    """
+    Parse ``data`` and return its root with every element named ``tag``
+    (in Clark notation) paired with its parent.
+    """
+    return finder_for(backend)(data, tag)
+
+
+def parse(data: bytes, backend: str = "") -> Element:
+    backend = backend or BACKEND
+    if backend == "lxml" and lxml_etree is not None:
+        return lxml_etree.fromstring(data, _LXML_PARSER)
+    return ET.fromstring(data)
+
+
+def tostring(root: Element, encoding: str = "utf-8") -> bytes:
+    """
+    ``ET.tostring(root, encoding, xml_declaration=True)``, byte for byte.
+
+    ElementTree's own serializer is used, but it writes into a list rather
+    than through a TextIOWrapper, which spends most of its time resetting
+    the encoder on every small write. Those helpers are private to CPython;
+    tests/test_xml_backend.py checks the output against ``ET.tostring``.
+    """
+    serialize = getattr(ET, "_serialize_xml", None)
+    namespaces = getattr(ET, "_namespaces", None)
+    if serialize is None or namespaces is None or encoding.lower() not in ("utf-8", "utf8"):
+        return ET.tostring(root, encoding=encoding, xml_declaration=True)
+    parts = [f"<?xml version='1.0' encoding='{encoding}'?>\n"]
+    try:
+        qnames, declared = namespaces(root, None)
+        serialize(parts.append, root, qnames, declared, short_empty_elements=True)
+    except TypeError:
+        # The private helpers changed shape; use the public path.
+        return ET.tostring(root, encoding=encoding, xml_declaration=True)
+    return "".join(parts).encode("utf-8")
@@ -0,0 +1,136 @@
+"""
+Streaming rewrite helpers for ZIP-based Office documents (PPTX).
+
+Only the members that are being edited are held in memory. Every other
+member is copied from the source archive as raw compressed bytes, so media
+is never inflated or re-deflated and peak memory does not grow with the
+size of the deck.
+"""
+
+from __future__ import annotations
+
+import copy
+import os
+import struct
+import tempfile
+import zipfile
+from pathlib import Path
+from typing import Callable, Dict, Mapping, Optional
+
+COPY_CHUNK_SIZE = 1024 * 1024
+LOCAL_HEADER_SIZE = 30
+DATA_DESCRIPTOR_FLAG = 0x08
+ZIP64_EXTRA_ID = 0x0001
+
+
+def read_members(
+    zin: zipfile.ZipFile,
+    predicate: Callable[[str], bool],
+) -> Dict[str, bytes]:
+    """Decompress only the members whose name matches ``predicate``."""
+    return {
+        info.filename: zin.read(info)
+        for info in zin.infolist()
+        if predicate(info.filename)
+    }
+
+
+def _strip_zip64_extra(extra: bytes) -> bytes:
+    """Drop the ZIP64 extra field; zipfile re-adds it when it is needed."""
+    kept = bytearray()
+    pos = 0
+    while pos + 4 <= len(extra):
+        header_id, size = struct.unpack("<HH", extra[pos : pos + 4])
+        end = pos + 4 + size
+        if header_id != ZIP64_EXTRA_ID:
+            kept += extra[pos:end]
+        pos = end
+    return bytes(kept)
+
+
+def copy_member_raw(
+    zin: zipfile.ZipFile,
+    zout: zipfile.ZipFile,
+    info: zipfile.ZipInfo,
+) -> None:
+    """Copy one member's compressed payload from ``zin`` to ``zout`` untouched."""
+    src = zin.fp
+    src.seek(info.header_offset)
+    header = src.read(LOCAL_HEADER_SIZE)
+    if len(header) != LOCAL_HEADER_SIZE or header[:4] != zipfile.stringFileHeader:
+        raise zipfile.BadZipFile(f"Bad local header for member {info.filename!r}")
+    name_len, extra_len = struct.unpack("<HH", header[26:30])
+    src.seek(info.header_offset + LOCAL_HEADER_SIZE + name_len + extra_len)
+
+    out_info = copy.copy(info)
+    # CRC and sizes are known from the central directory, so write them in
+    # the local header instead of carrying over a trailing data descriptor.
+    out_info.flag_bits &= ~DATA_DESCRIPTOR_FLAG
+    out_info.extra = _strip_zip64_extra(info.extra)
+
+    dest = zout.fp
+    out_info.header_offset = dest.tell()
+    dest.write(out_info.FileHeader())
+
+    remaining = info.compress_size
+    while remaining > 0:
+        chunk = src.read(min(COPY_CHUNK_SIZE, remaining))
+        if not chunk:
+            raise zipfile.BadZipFile(f"Truncated data for member {info.filename!r}")
+        dest.write(chunk)
+        remaining -= len(chunk)
+
+    zout.filelist.append(out_info)
+    zout.NameToInfo[out_info.filename] = out_info
+    zout.start_dir = dest.tell()
+    zout._didModify = True
+
+
+def write_members(
+    zin: zipfile.ZipFile,
+    zout: zipfile.ZipFile,
+    replacements: Mapping[str, Optional[bytes]],
+) -> None:
+    """
+    Write every member of ``zin`` to ``zout`` in the original order.
+
+    Names mapped to bytes in ``replacements`` are re-encoded with their
+    original compression; names mapped to ``None`` are dropped; everything
+    else is copied raw.
+    """
+    for info in zin.infolist():
+        if info.filename in replacements:
+            data = replacements[info.filename]
+            if data is None:
+                continue
+            out_info = copy.copy(info)
+            out_info.extra = _strip_zip64_extra(info.extra)
+            zout.writestr(out_info, data)
+        else:
+            copy_member_raw(zin, zout, info)
+
+
+def rewrite_zip(
+    src: Path,
+    dest: Path,
+    replacements: Mapping[str, Optional[bytes]],
+) -> None:
+    """
+    Stream ``src`` into ``dest`` applying ``replacements``.
+
+    The archive is written to a temporary file next to ``dest`` and moved
+    into place afterwards, so ``src`` and ``dest`` may be the same path.
+    """
+    dest = Path(dest)
+    with tempfile.NamedTemporaryFile(
+        delete=False, suffix=dest.suffix or ".zip", dir=dest.parent
+    ) as tmp:
+        tmp_path = Path(tmp.name)
+    try:
+        with zipfile.ZipFile(src, "r") as zin, zipfile.ZipFile(tmp_path, "w") as zout:
+            write_members(zin, zout, replacements)
+        os.replace(tmp_path, dest)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink(missing_ok=True)
+